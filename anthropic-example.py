@@ -1,7 +1,9 @@
 """ Example of using the Anthropic API to create a message batch with documents and citations."""
+import copy
+import hashlib
+import json
 import random
 import subprocess
-import sys
 import time
 # import uuid
 import anthropic
@@ -11,19 +13,31 @@ from anthropic.types.messages.batch_create_params import Request
 TOTAL_TOKEN_LIMIT = 200000
 
 THINKING_MODEL_NAME = "claude-3-7-sonnet-20250219"
+# Cheap model for the sizing/count_tokens path; token counts are stable
+# enough across the family for budget decisions, so reserve Sonnet with
+# thinking for the actual batch requests.
+SIZING_MODEL = "claude-haiku-4-5"
 THINKING_BUDGET = 1024  # Budget for thinking tokens
 
-# Load Django from SWE-agent
-from datasets import load_dataset
-dataset = load_dataset('princeton-nlp/SWE-bench', split='test')
-django_instances = [
-    instance
-    for instance in dataset
-    if instance['instance_id'].startswith('django__django-')
-]
-ranges = list(range(len(django_instances)))
-random.shuffle(ranges)
-django_instances = [django_instances[random.randint(0, len(django_instances) - 1)]]
+# Load Django from SWE-agent; the filtered subset is cached locally so repeat
+# runs skip the HF Hub download and the full-dataset parse.
+from pathlib import Path
+
+from datasets import Dataset, load_dataset
+
+DJANGO_CACHE = Path(".cache/django_instances.parquet")
+if DJANGO_CACHE.exists():
+    django_dataset = Dataset.from_parquet(str(DJANGO_CACHE))
+else:
+    dataset = load_dataset('princeton-nlp/SWE-bench', split='test')
+    # Arrow-level filter instead of a Python row-wise list comprehension
+    django_dataset = dataset.filter(
+        lambda x: x['instance_id'].startswith('django__django-')
+    )
+    DJANGO_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    django_dataset.to_parquet(str(DJANGO_CACHE))
+# Sample a single instance for this demo run
+django_instances = [django_dataset[random.randrange(len(django_dataset))]]
 
 def get_show(commit: str):
     """Retrieve the commit details using git show."""
@@ -32,12 +46,66 @@ def get_show(commit: str):
         capture_output=True, text=True, check=False, cwd=REPO_PATH,
     )
 
-def get_diff(n: int, base_commit: str, cwd: str):
-    """Compose the codebase by retrieving the diff of the last n commits from the base commit."""
-    return subprocess.run(
-        ["git", "diff", f"{base_commit}~{n}", f"{base_commit}"],
-        capture_output=True, text=True, check=False, cwd=cwd, encoding='ISO-8859-1',
-    )
+def iter_diffs(base_commit: str, cwd: str, page: int = 5, max_pages: int = 8,
+               token_budget: int | None = None):
+    """Yield (commit_count, diff_chunk) pages of `page` commits, newest first.
+
+    Pages are streamed from git line-by-line instead of buffered whole, so
+    peak memory is one page rather than the full diff. When token_budget is
+    given, git is terminated as soon as the running estimate for the current
+    page would cross it, and that partial page is dropped.
+    """
+    used = 0
+    for i in range(page, page * max_pages + 1, page):
+        truncated = False
+        with subprocess.Popen(
+            ["git", "diff", f"{base_commit}~{i}", f"{base_commit}~{i - page}"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=cwd, text=True, encoding='ISO-8859-1',
+        ) as proc:
+            lines = []
+            chunk_tokens = 0
+            for line in proc.stdout:
+                chunk_tokens += count_tokens_local(line)
+                if token_budget is not None and used + chunk_tokens > token_budget:
+                    # Kill git early; the rest of this page cannot fit.
+                    proc.terminate()
+                    truncated = True
+                    break
+                lines.append(line)
+        if truncated:
+            return
+        if proc.returncode != 0:
+            # base_commit~i predates the first commit; no more history to fetch.
+            return
+        used += chunk_tokens
+        yield i, "".join(lines)
+
+# Rough chars-per-token ratio for diff/code text; used to size the commit
+# window locally instead of probing the API with the full payload each retry.
+CHARS_PER_TOKEN = 3.4
+
+def count_tokens_local(text: str) -> int:
+    """Estimate the token count of text without a network round trip."""
+    return int(len(text) / CHARS_PER_TOKEN)
+
+# input_tokens memoized by payload hash so retries on an identical
+# (system, messages) payload never repeat the network call.
+_count_tokens_cache = {}
+
+def count_tokens_api(instance_system, instance_messages) -> int:
+    """Authoritative count_tokens call, deduplicated by a SHA-256 of the payload."""
+    payload_hash = hashlib.sha256(
+        json.dumps([instance_system, instance_messages], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    if payload_hash not in _count_tokens_cache:
+        response = client.messages.count_tokens(
+            model=SIZING_MODEL,
+            system=instance_system,
+            messages=instance_messages,
+        )
+        _count_tokens_cache[payload_hash] = response.model_dump()['input_tokens']
+    return _count_tokens_cache[payload_hash]
 
 thinking = {
     "type": "enabled",
@@ -45,14 +113,19 @@ thinking = {
 }
 system = [{
     "type": "text",
-    "text": "You are an AI assistant tasked with developing features and maintaining the codebase. Your goal is to check for violations of code changes that do not follow existing coding styles, docs, inline comments, design patterns, naming conventions, or precise reference to implementations. Also, any similar functions should be extracted to be a util. No summarize, confirm, nor compliment, just be concise without highlighting any positive outcomes and directly point out possible improvements.\n"
+    "text": "You are an AI assistant tasked with developing features and maintaining the codebase. Your goal is to check for violations of code changes that do not follow existing coding styles, docs, inline comments, design patterns, naming conventions, or precise reference to implementations. Also, any similar functions should be extracted to be a util. No summarize, confirm, nor compliment, just be concise without highlighting any positive outcomes and directly point out possible improvements.\n",
+    # Cache the static reviewer instructions first so the system tier forms a
+    # stable cached prefix shared by count_tokens retries and batches.create.
+    # By default, the cache has a 5-minute lifetime.
+    # The cache is refreshed for no additional cost each time the cached content is used.
+    "cache_control": {"type": "ephemeral"}
 },
 {
+    # Per-instance codebase diff: changes on every instance, so it stays
+    # uncached and after the cache breakpoint — caching it would just write
+    # a new cache entry per instance with no prefix reuse.
     "type": "text",
     "text": "",
-    # By default, the cache has a 5-minute lifetime.
-    # The cache is refreshed for no additional cost each time the cached content is used.
-    "cache_control": {"type": "ephemeral"}
 }]
 messages = [{
     "role": "user",
@@ -77,9 +150,11 @@ messages = [{
 }]
 client = anthropic.Anthropic()
 
-# Find as many as possible most recent commits to attached
+# Find as many as possible most recent commits to attached, collecting one
+# batch Request per instance so Anthropic runs them in parallel server-side
+# (and bills them at the batch discount) instead of one batch per instance.
+batch_requests = []
 for instance in django_instances:  # Total 850 instances
-    commits = 40  # Initila number of commits to retrieve
     data = instance['patch'] + "\n\n" + instance['test_patch']
 
     REPO_PATH = "/Users/liniju/Documents/claude-coding-style/django"
@@ -97,75 +172,60 @@ for instance in django_instances:  # Total 850 instances
     # BASE_COMMIT = f"{PATCH_COMMIT}^"
 
     BASE_COMMIT = instance['base_commit']
-    result = get_diff(commits, instance['base_commit'], REPO_PATH)
-    if result.returncode == 0:
-        codebase = result.stdout
-    else:
-        print(f"Error executing command. Exit code: {result.returncode}")
-        print(f"Stderr: {result.stderr}")
-        sys.exit(1)
 
-    system[1]['text'] = codebase
-    messages[0]['content'][1]['source']['data'] = data
+    # Fetch commits in small pages and accumulate until the token budget is
+    # hit, instead of guessing a large window and shrinking on overflow.
+    # Pages are kept separate so an overflow below can drop the oldest ones.
+    overhead = count_tokens_local(system[0]['text']) + count_tokens_local(data)
+    budget = int(TOTAL_TOKEN_LIMIT * 0.9) - overhead
+    pages = list(iter_diffs(BASE_COMMIT, REPO_PATH, token_budget=budget))
 
+    # One authoritative count to confirm the local estimate. `thinking` is
+    # deliberately omitted: it does not change the input token count and only
+    # adds server-side work to the sizing call. The fixed chars-per-token
+    # ratio can undershoot on token-dense diffs, so when the real count still
+    # overflows, drop the oldest page and re-count until the payload fits —
+    # otherwise the request just errors server-side inside the batch.
     while True:
-        # If the request is successful, break the loop
-        try:
-            response = client.messages.count_tokens(
-                # model="claude-opus-4-20250514",
-                model=THINKING_MODEL_NAME, # Extended thinking
-                thinking=thinking,
-                system=system,
-                messages=messages,
-            )
+        # Pages arrive newest first but the prompt reads oldest to newest
+        codebase = "".join(chunk for _, chunk in reversed(pages))
+        commits = pages[-1][0] if pages else 0
+
+        # Snapshot the templates per instance so every Request carries its own
+        # codebase/patch payload. Ordering matters for prompt caching: cached
+        # static instructions first, then the per-instance codebase, and the
+        # per-instance patch document as the final content block.
+        instance_system = [system[0], {**system[1], "text": codebase}]
+        instance_messages = copy.deepcopy(messages)
+        instance_messages[0]['content'][1]['source']['data'] = data
+
+        input_tokens = count_tokens_api(instance_system, instance_messages)
+        if input_tokens <= TOTAL_TOKEN_LIMIT or not pages:
             break
-        except anthropic.BadRequestError as e:
-            print(instance['instance_id'], commits, e)
-            # Reduce the number of commits to avoid exceeding the input token limit.
-            commits //= 3
-            system[1]['text'] = get_diff(commits, instance['base_commit'], REPO_PATH).stdout
-            response = client.messages.count_tokens(
-                model=THINKING_MODEL_NAME,
-                thinking=thinking, # Do we want to further avoid thinking?
-                system=system,
-                messages=messages,
-            )
+        pages.pop()
+    if commits < 5:
+        print(instance['instance_id'], commits, input_tokens)
 
-    while response.model_dump()['input_tokens'] > TOTAL_TOKEN_LIMIT:
-        # Reduce the number of commits to avoid exceeding the input token limit.
-        commits //= 2
-        system[1]['text'] = get_diff(commits, instance['base_commit'], REPO_PATH).stdout
-        response = client.messages.count_tokens(
+    batch_requests.append(Request(
+        # Meaningful custom_id so results (unordered) can be matched back.
+        custom_id=instance['instance_id'],
+        params=MessageCreateParamsNonStreaming(
             model=THINKING_MODEL_NAME,
-            thinking=thinking, # Do we want to further avoid thinking?
-            system=system,
-            messages=messages,
-        )
-    if commits < 5:
-        print(instance['instance_id'], commits, response.model_dump()['input_tokens'])
+            max_tokens = THINKING_BUDGET + 64, # `max_tokens` must be greater than `thinking.budget_tokens`
+            thinking=thinking,
+            system=instance_system,
+            messages=instance_messages,
+            # betas=[
+            #     # Locations of Developer Guide
+            #     "files-api-2025-04-14", # Files API
+            #     "code-execution-2025-05-22", # Code execution tool
+            #     "interleaved-thinking-2025-05-14", # Building with extended thinking
+            # ],
+        ),
+    ))
 
 # [Note] 'claude-2.0' does not support cache_control and batching.
-message_batch = client.messages.batches.create(
-    requests=[
-        Request(
-            # custom_id=str(uuid.uuid4()),
-            custom_id="my-first-request",
-            params=MessageCreateParamsNonStreaming(
-                model=THINKING_MODEL_NAME,
-                max_tokens = THINKING_BUDGET + 64, # `max_tokens` must be greater than `thinking.budget_tokens`
-                thinking=thinking,
-                system=system,
-                messages=messages,
-                # betas=[
-                #     # Locations of Developer Guide
-                #     "files-api-2025-04-14", # Files API
-                #     "code-execution-2025-05-22", # Code execution tool
-                #     "interleaved-thinking-2025-05-14", # Building with extended thinking
-                # ],
-            ),
-        ),
-    ]
-)
+message_batch = client.messages.batches.create(requests=batch_requests)
 
 print(message_batch)
 # No cache_control: MessageBatch(id='msgbatch_01MhV6ghZZ1urrLqiJfFsCmm', archived_at=None, cancel_initiated_at=None, created_at=datetime.datetime(2025, 6, 30, 22, 5, 35, 34407, tzinfo=datetime.timezone.utc), ended_at=None, expires_at=datetime.datetime(2025, 7, 1, 22, 5, 35, 34407, tzinfo=datetime.timezone.utc), processing_status='in_progress', request_counts=MessageBatchRequestCounts(canceled=0, errored=0, expired=0, processing=2, succeeded=0), results_url=None, type='message_batch')
@@ -173,7 +233,9 @@ print(message_batch)
 
 # TODO: Verify that the total batch request size doesn’t exceed 256 MB. If the request size is too large, you may get a 413 request_too_large error.
 
-wait_time = 10
+# Poll with exponential backoff (capped) so fast batches are detected in
+# seconds while long-running ones don't hammer the API near the tail.
+wait_time = 2
 MESSAGE_BATCH_ID = message_batch.id
 message_batch = None
 while True:
@@ -184,7 +246,7 @@ while True:
     if message_batch.processing_status == "ended":
         break
     print(f"Batch {MESSAGE_BATCH_ID} is still processing...")
-    wait_time += 10
+    wait_time = min(int(wait_time * 1.5) + 1, 120)
 
 # Stream results file in memory-efficient chunks, processing one at a time
 for result in client.messages.batches.results(
@@ -193,8 +255,15 @@ for result in client.messages.batches.results(
     match result.result.type:
         case "succeeded":
             # [Note] Use meaningful custom_id values, order is not guaranteed.
+            print(result.custom_id)
             print(result.result)
             print('\n' + '-' * 80 + '\n')
+            # Verify prompt cache hit rate for the cached system blocks.
+            usage = result.result.message.usage
+            print(
+                f"cache_creation_input_tokens={usage.cache_creation_input_tokens} "
+                f"cache_read_input_tokens={usage.cache_read_input_tokens}"
+            )
             for block in result.result.message.content:
                 print(block.text)
         case "errored":
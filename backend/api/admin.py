@@ -1,41 +1,63 @@
 import time
 
-from fastapi import APIRouter
+from fastapi import APIRouter, BackgroundTasks
 
+from backend.api.selectors import warm_selector_caches
 from backend.services import scanner
 from backend.services.label_stats_cache import label_stats_cache
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Stats from the most recent completed refresh, exposed via /admin/status
+_last_refresh_stats: dict[str, str | float | dict[str, int]] = {}
 
-@router.post("/refresh")
-def refresh_data() -> dict[str, str | float | dict[str, int]]:
-    """
-    Refresh/reload data from the submissions directory.
 
-    Useful for development or when new data is added without restarting the server.
-    """
+def _do_refresh() -> None:
+    """Re-scan the data directory, rebuild caches, and record refresh stats."""
     start_time = time.time()
 
     # Re-scan the data
     scanner.scan_data()
 
-    # Rebuild label statistics cache
-    label_stats_cache.rebuild_cache()
+    # Drop memoized lookups that may reference pre-scan objects
+    scanner.get_problem.cache_clear()
+    scanner.get_agent_submission.cache_clear()
 
-    # Get updated statistics
-    stats = scanner.get_stats()
+    # Rebuild label statistics cache; reuse its counters as the refresh
+    # stats instead of walking the data again via scanner.get_stats()
+    report = label_stats_cache.rebuild_cache()
+
+    # Recompute the precomputed selector responses against the new data
+    warm_selector_caches()
     elapsed = time.time() - start_time
 
-    return {
-        "message": "Data refresh completed successfully",
-        "scan_time": round(elapsed, 3),
-        "stats": stats,
-    }
+    _last_refresh_stats.clear()
+    _last_refresh_stats.update(
+        {
+            "message": "Data refresh completed successfully",
+            "scan_time": round(elapsed, 3),
+            "stats": report,
+        }
+    )
+
+
+@router.post("/refresh")
+def refresh_data(background: BackgroundTasks) -> dict[str, str]:
+    """
+    Refresh/reload data from the submissions directory.
+
+    Runs as a background task so the request returns immediately instead of
+    blocking for the full scan; completed stats appear in GET /admin/status.
+    Useful for development or when new data is added without restarting the server.
+    """
+    background.add_task(_do_refresh)
+    return {"status": "queued", "message": "Data refresh queued"}
 
 
 @router.get("/status")
-def get_system_status() -> dict[str, str | dict[str, int]]:
+def get_system_status() -> dict[
+    str, str | dict[str, int] | dict[str, str | float | dict[str, int]]
+]:
     """
     Get current system status and data statistics.
 
@@ -47,4 +69,5 @@ def get_system_status() -> dict[str, str | dict[str, int]]:
         "status": "healthy",
         "message": "System is operational",
         "data_stats": stats,
+        "last_refresh": _last_refresh_stats,
     }
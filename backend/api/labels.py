@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from backend.models import LabelCreate, LabelResponse
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/labels", tags=["labels"])
 
 # Put specific routes first to avoid conflicts
 @router.get("/stats/{problem_id}")
-def get_label_stats(problem_id: str) -> dict[str, int | list[str]]:
+async def get_label_stats(problem_id: str) -> dict[str, int | list[str]]:
     """
     Get statistics about labels for a specific problem.
     """
@@ -24,15 +25,21 @@ def get_label_stats(problem_id: str) -> dict[str, int | list[str]]:
     if not problem:
         raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
 
-    # Get all labels for this problem
-    labels = file_service.get_all_labels_for_problem(problem_id)
+    # Serve labeled agents from the in-memory cache; fall back to the
+    # filesystem walk only on a cache miss
+    labeled_agents_set = label_stats_cache.get_labeled_agents(problem_id)
+    if labeled_agents_set is None:
+        labels = await run_in_threadpool(
+            file_service.get_all_labels_for_problem, problem_id
+        )
+        labeled_agents_set = {label.agent_name for label in labels}
 
     # Get all possible agents for this problem
     all_submissions = scanner.get_all_agent_submissions(problem_id)
 
-    labeled_agents = [label.agent_name for label in labels]
+    labeled_agents = list(labeled_agents_set)
     unlabeled_agents = [
-        agent for agent in all_submissions if agent not in labeled_agents
+        agent for agent in all_submissions if agent not in labeled_agents_set
     ]
 
     return {
@@ -45,7 +52,7 @@ def get_label_stats(problem_id: str) -> dict[str, int | list[str]]:
 
 
 @router.get("/problem/{problem_id}", response_model=list[LabelResponse])
-def get_all_labels_for_problem(problem_id: str) -> list[LabelResponse]:
+async def get_all_labels_for_problem(problem_id: str) -> list[LabelResponse]:
     """
     Get all user labels/comments for a specific problem.
 
@@ -58,13 +65,15 @@ def get_all_labels_for_problem(problem_id: str) -> list[LabelResponse]:
         raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
 
     # Get all labels for this problem
-    labels = file_service.get_all_labels_for_problem(problem_id)
+    labels = await run_in_threadpool(
+        file_service.get_all_labels_for_problem, problem_id
+    )
     return [file_service.label_to_response(label) for label in labels]
 
 
 # Generic routes last
 @router.get("/{problem_id}/{agent_name}", response_model=LabelResponse | None)
-def get_label(problem_id: str, agent_name: str) -> LabelResponse | None:
+async def get_label(problem_id: str, agent_name: str) -> LabelResponse | None:
     """
     Get user label/comment for a specific problem-agent combination.
 
@@ -85,7 +94,7 @@ def get_label(problem_id: str, agent_name: str) -> LabelResponse | None:
         )
 
     # Load label if it exists
-    label = file_service.load_label(problem_id, agent_name)
+    label = await run_in_threadpool(file_service.load_label, problem_id, agent_name)
     if label:
         return file_service.label_to_response(label)
 
@@ -93,7 +102,7 @@ def get_label(problem_id: str, agent_name: str) -> LabelResponse | None:
 
 
 @router.post("/{problem_id}/{agent_name}", response_model=LabelResponse)
-def save_label(
+async def save_label(
     problem_id: str, agent_name: str, label_create: LabelCreate
 ) -> LabelResponse:
     """
@@ -116,16 +125,19 @@ def save_label(
         )
 
     # Save the label
-    label = file_service.save_label(problem_id, agent_name, label_create)
+    label = await run_in_threadpool(
+        file_service.save_label, problem_id, agent_name, label_create
+    )
 
-    # Update cache stats
-    label_stats_cache.update_problem_label_stats(problem_id, agent_name, has_label=True)
+    # Queue cache stats update for the write-back coalescer; the worker
+    # invalidates the selector caches once the batch is applied
+    label_stats_cache.enqueue_update(problem_id, agent_name, has_label=True)
 
     return file_service.label_to_response(label)
 
 
 @router.delete("/{problem_id}/{agent_name}")
-def delete_label(problem_id: str, agent_name: str) -> dict[str, str]:
+async def delete_label(problem_id: str, agent_name: str) -> dict[str, str]:
     """
     Delete user label/comment for a specific problem-agent combination.
 
@@ -137,13 +149,12 @@ def delete_label(problem_id: str, agent_name: str) -> dict[str, str]:
         raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
 
     # Attempt to delete the label
-    deleted = file_service.delete_label(problem_id, agent_name)
+    deleted = await run_in_threadpool(file_service.delete_label, problem_id, agent_name)
 
     if deleted:
-        # Update cache stats
-        label_stats_cache.update_problem_label_stats(
-            problem_id, agent_name, has_label=False
-        )
+        # Queue cache stats update for the write-back coalescer; the worker
+        # invalidates the selector caches once the batch is applied
+        label_stats_cache.enqueue_update(problem_id, agent_name, has_label=False)
         return {"message": f"Label deleted for {problem_id}/{agent_name}"}
     else:
         raise HTTPException(
@@ -154,7 +165,7 @@ def delete_label(problem_id: str, agent_name: str) -> dict[str, str]:
 
 # Draft endpoints
 @router.post("/{problem_id}/{agent_name}/draft")
-def save_draft(
+async def save_draft(
     problem_id: str, agent_name: str, draft_create: DraftCreate
 ) -> dict[str, str]:
     """
@@ -176,14 +187,16 @@ def save_draft(
         )
 
     try:
-        file_service.save_draft(problem_id, agent_name, draft_create.content)
+        await run_in_threadpool(
+            file_service.save_draft, problem_id, agent_name, draft_create.content
+        )
         return {"message": f"Draft saved for {problem_id}/{agent_name}"}
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @router.get("/{problem_id}/{agent_name}/draft")
-def get_draft(problem_id: str, agent_name: str) -> dict[str, str] | None:
+async def get_draft(problem_id: str, agent_name: str) -> dict[str, str] | None:
     """
     Get a draft for a specific problem-agent combination.
 
@@ -202,7 +215,7 @@ def get_draft(problem_id: str, agent_name: str) -> dict[str, str] | None:
             detail=f"Agent '{agent_name}' has no submission for problem '{problem_id}'",
         )
 
-    content = file_service.load_draft(problem_id, agent_name)
+    content = await run_in_threadpool(file_service.load_draft, problem_id, agent_name)
     if content is not None:
         return {"content": content}
 
@@ -210,12 +223,20 @@ def get_draft(problem_id: str, agent_name: str) -> dict[str, str] | None:
 
 
 @router.post("/{problem_id}/{agent_name}/commit", response_model=LabelResponse)
-def commit_draft(problem_id: str, agent_name: str) -> LabelResponse:
+async def commit_draft(problem_id: str, agent_name: str) -> LabelResponse:
     """
     Commit a draft by moving it to the label file.
 
     This is an atomic file move operation.
     """
+    # Stat the draft first so the common "no draft" case 404s without
+    # scanner lookups or a cache update
+    if not file_service.draft_exists(problem_id, agent_name):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No draft found for {problem_id}/{agent_name}",
+        )
+
     # Verify problem exists
     problem = scanner.get_problem(problem_id)
     if not problem:
@@ -230,20 +251,21 @@ def commit_draft(problem_id: str, agent_name: str) -> LabelResponse:
         )
 
     try:
-        label = file_service.commit_draft(problem_id, agent_name)
-
-        # Update cache stats
-        label_stats_cache.update_problem_label_stats(
-            problem_id, agent_name, has_label=True
+        label = await run_in_threadpool(
+            file_service.commit_draft, problem_id, agent_name
         )
 
+        # Queue cache stats update for the write-back coalescer; the worker
+        # invalidates the selector caches once the batch is applied
+        label_stats_cache.enqueue_update(problem_id, agent_name, has_label=True)
+
         return file_service.label_to_response(label)
     except RuntimeError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.delete("/{problem_id}/{agent_name}/draft")
-def delete_draft(problem_id: str, agent_name: str) -> dict[str, str]:
+async def delete_draft(problem_id: str, agent_name: str) -> dict[str, str]:
     """
     Delete a draft for a specific problem-agent combination.
     """
@@ -252,7 +274,7 @@ def delete_draft(problem_id: str, agent_name: str) -> dict[str, str]:
     if not problem:
         raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
 
-    deleted = file_service.delete_draft(problem_id, agent_name)
+    deleted = await run_in_threadpool(file_service.delete_draft, problem_id, agent_name)
 
     if deleted:
         return {"message": f"Draft deleted for {problem_id}/{agent_name}"}
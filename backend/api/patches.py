@@ -1,4 +1,7 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
 
 from backend.models import PatchContent, PatchInfo
 from backend.services import diff_parser, ground_truth_loader, scanner
@@ -8,7 +11,7 @@ router = APIRouter(prefix="/patches", tags=["patches"])
 
 
 @router.get("/problems/{problem_id}/agents/{agent_name}", response_model=PatchContent)
-def get_agent_patch(problem_id: str, agent_name: str) -> PatchContent:
+async def get_agent_patch(problem_id: str, agent_name: str) -> PatchContent:
     """
     Get agent patch content for a specific problem.
 
@@ -28,26 +31,24 @@ def get_agent_patch(problem_id: str, agent_name: str) -> PatchContent:
         )
 
     # Load patch content
-    content = scanner.load_patch_content(submission)
+    content = await asyncio.to_thread(scanner.load_patch_content, submission)
     if content is None:
         raise HTTPException(
             status_code=404,
             detail=f"Patch file not found: {submission.patch_file}",
         )
 
-    # Parse patch metadata
-    is_valid = diff_parser.validate_patch_format(content)
-    changed_files = diff_parser.extract_changed_files(content)
-    raw_stats = diff_parser.count_changes(content)
+    # Parse patch metadata in a single pass over the content
+    is_valid, changed_files, additions, deletions = diff_parser.parse_all(content)
 
     # Convert to PatchStats model
-    stats = PatchStats(
+    stats = PatchStats.model_construct(
         file_count=len(changed_files),
-        additions=raw_stats.get("additions", 0),
-        deletions=raw_stats.get("deletions", 0),
+        additions=additions,
+        deletions=deletions,
     )
 
-    return PatchContent(
+    return PatchContent.model_construct(
         content=content,
         is_valid=is_valid,
         changed_files=changed_files,
@@ -55,8 +56,39 @@ def get_agent_patch(problem_id: str, agent_name: str) -> PatchContent:
     )
 
 
+@router.get("/problems/{problem_id}/agents/{agent_name}/raw")
+async def get_agent_patch_raw(problem_id: str, agent_name: str) -> FileResponse:
+    """
+    Stream the raw agent patch file without JSON wrapping.
+
+    Serves the bytes straight from disk, skipping the decode + JSON
+    encode round trip of the PatchContent endpoint. Pair with the /info
+    endpoint when only metadata is needed.
+    """
+    # Verify problem exists
+    problem = scanner.get_problem(problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
+
+    # Get agent submission
+    submission = scanner.get_agent_submission(agent_name, problem_id)
+    if not submission:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent '{agent_name}' has no submission for problem '{problem_id}'",
+        )
+
+    if not submission.exists:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Patch file not found: {submission.patch_file}",
+        )
+
+    return FileResponse(submission.patch_file, media_type="text/x-diff")
+
+
 @router.get("/problems/{problem_id}/agents/{agent_name}/info", response_model=PatchInfo)
-def get_agent_patch_info(problem_id: str, agent_name: str) -> PatchInfo:
+async def get_agent_patch_info(problem_id: str, agent_name: str) -> PatchInfo:
     """
     Get agent patch metadata without loading full content.
 
@@ -75,27 +107,23 @@ def get_agent_patch_info(problem_id: str, agent_name: str) -> PatchInfo:
             detail=f"Agent '{agent_name}' has no submission for problem '{problem_id}'",
         )
 
-    # Check if file exists without loading content
-    from pathlib import Path
-
-    patch_file = Path(submission.patch_file)
-    exists = patch_file.exists()
-
-    if exists:
-        # Load content to get stats (could be optimized to read only header)
-        content = scanner.load_patch_content(submission)
-        if content:
-            changed_files = diff_parser.extract_changed_files(content)
-            stats = diff_parser.count_changes(content)
-            return PatchInfo(
-                exists=True,
-                file_path=submission.patch_file,
-                file_count=len(changed_files),
-                additions=stats["additions"],
-                deletions=stats["deletions"],
-            )
+    # Missing patches are answered from the scan-time index without a syscall
+    header = (
+        await asyncio.to_thread(diff_parser.scan_patch_header, submission.patch_file)
+        if submission.exists
+        else None
+    )
+    if header is not None:
+        file_count, additions, deletions = header
+        return PatchInfo.model_construct(
+            exists=True,
+            file_path=submission.patch_file,
+            file_count=file_count,
+            additions=additions,
+            deletions=deletions,
+        )
 
-    return PatchInfo(
+    return PatchInfo.model_construct(
         exists=False,
         file_path=submission.patch_file,
         file_count=0,
@@ -105,7 +133,7 @@ def get_agent_patch_info(problem_id: str, agent_name: str) -> PatchInfo:
 
 
 @router.get("/problems/{problem_id}/ground_truth", response_model=PatchContent)
-def get_ground_truth_patch(problem_id: str) -> PatchContent:
+async def get_ground_truth_patch(problem_id: str) -> PatchContent:
     """
     Get ground truth patch for a problem from SWE-bench verified dataset.
     """
@@ -116,22 +144,24 @@ def get_ground_truth_patch(problem_id: str) -> PatchContent:
 
     # Try to load ground truth patch from SWE-bench dataset
     if ground_truth_loader.is_available():
-        gt_patch = ground_truth_loader.get_ground_truth_patch(problem_id)
+        gt_patch = await asyncio.to_thread(
+            ground_truth_loader.get_ground_truth_patch, problem_id
+        )
 
         if gt_patch and gt_patch.strip():
-            # Parse ground truth patch metadata
-            is_valid = diff_parser.validate_patch_format(gt_patch)
-            changed_files = diff_parser.extract_changed_files(gt_patch)
-            raw_stats = diff_parser.count_changes(gt_patch)
+            # Parse ground truth patch metadata in a single pass
+            is_valid, changed_files, additions, deletions = diff_parser.parse_all(
+                gt_patch
+            )
 
             # Convert to PatchStats model
-            stats = PatchStats(
+            stats = PatchStats.model_construct(
                 file_count=len(changed_files),
-                additions=raw_stats.get("additions", 0),
-                deletions=raw_stats.get("deletions", 0),
+                additions=additions,
+                deletions=deletions,
             )
 
-            return PatchContent(
+            return PatchContent.model_construct(
                 content=gt_patch,
                 is_valid=is_valid,
                 changed_files=changed_files,
@@ -153,9 +183,9 @@ def get_ground_truth_patch(problem_id: str) -> PatchContent:
         f"GitHub: {problem.github_url}\n"
     )
 
-    return PatchContent(
+    return PatchContent.model_construct(
         content=placeholder_content,
         is_valid=False,  # Not a real patch
         changed_files=[],
-        stats=PatchStats(file_count=0, additions=0, deletions=0),
+        stats=PatchStats.model_construct(file_count=0, additions=0, deletions=0),
     )
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/problems", tags=["problems"])
 
 
 @router.get("/", response_model=list[Problem])
-def list_problems(
+async def list_problems(
     repo: str | None = Query(
         default=None, description="Filter by repository (e.g., 'django__django')"
     ),
@@ -28,14 +28,13 @@ def list_problems(
     """
     problems = scanner.get_problems(repo=repo)
 
-    # Apply pagination
-    paginated_problems = problems[offset : offset + limit]
-
-    return paginated_problems
+    # Apply pagination, then convert the scanner's internal records to the
+    # response model at the boundary
+    return [core.to_model() for core in problems[offset : offset + limit]]
 
 
 @router.get("/{problem_id}", response_model=ProblemWithSubmissions)
-def get_problem(problem_id: str) -> ProblemWithSubmissions:
+async def get_problem(problem_id: str) -> ProblemWithSubmissions:
     """
     Get a specific problem with all agent submissions.
 
@@ -50,29 +49,26 @@ def get_problem(problem_id: str) -> ProblemWithSubmissions:
     agent_submissions = scanner.get_all_agent_submissions(problem_id)
 
     return ProblemWithSubmissions(
-        problem=problem,
+        problem=problem.to_model(),
         agents=agent_submissions,
     )
 
 
 @router.get("/{problem_id}/stats")
-def get_problem_stats(problem_id: str) -> dict[str, int | list[str]]:
+async def get_problem_stats(problem_id: str) -> dict[str, int | list[str]]:
     """Get statistics for a specific problem."""
     problem = scanner.get_problem(problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
 
-    agent_submissions = scanner.get_all_agent_submissions(problem_id)
-
-    resolved_agents = [
-        agent_name
-        for agent_name, submission in agent_submissions.items()
-        if submission.resolved
-    ]
+    # Both counts come from indexes built at scan time; no submission
+    # objects are materialized or iterated at request time
+    resolved_agents = scanner.get_resolved_agents(problem_id)
+    total_agents = scanner.get_agent_count(problem_id)
 
     return {
-        "total_agents": len(agent_submissions),
+        "total_agents": total_agents,
         "resolved_count": len(resolved_agents),
-        "failed_count": len(agent_submissions) - len(resolved_agents),
+        "failed_count": total_agents - len(resolved_agents),
         "resolved_agents": resolved_agents,
     }
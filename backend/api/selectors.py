@@ -1,3 +1,7 @@
+import re
+from functools import lru_cache
+from operator import attrgetter
+
 from fastapi import APIRouter, Query
 
 from backend.models import Agent, ProblemSummary, Repository
@@ -6,32 +10,76 @@ from backend.services.label_stats_cache import label_stats_cache
 
 router = APIRouter(prefix="/selectors", tags=["selectors"])
 
+# Known display-name fixups, precompiled into a single alternation so one
+# regex pass replaces the per-call dict rebuild and per-entry substring scans
+_NAME_MAPPINGS = {
+    "Openhands": "OpenHands",
+    "Sweagent": "SWE-agent",
+    "Patchpilot": "PatchPilot",
+    "Augment Agent": "Augment Agent",
+    "Refact Agent": "Refact Agent",
+    "Moatless": "Moatless",
+}
+_NAME_MAPPING_RE = re.compile("|".join(map(re.escape, _NAME_MAPPINGS)))
+
 # FastAPI Query parameter defaults are evaluated at import time, which is safe
 # pyright: reportCallInDefaultInitializer=false
 
+# Precomputed selector responses. Their inputs only change on a data rescan
+# (plus label mutations for the repository list), so serving a cached list
+# replaces the per-request O(agents x problems) rebuild with a lookup.
+_agents_cache: list[Agent] | None = None
+_repositories_cache: list[Repository] | None = None
+_stats_cache: dict[str, int | float] | None = None
+
+
+def warm_selector_caches() -> None:
+    """Precompute selector responses; called at startup and after a refresh."""
+    global _agents_cache, _repositories_cache, _stats_cache
+    _agents_cache = _build_agent_list()
+    _repositories_cache = _build_repository_list()
+    _stats_cache = _build_overall_stats()
+
+
+def invalidate_selector_caches(*, labels_only: bool = False) -> None:
+    """Drop cached responses so the next request rebuilds them.
+
+    Label mutations only affect the repository list's labeled counts, so
+    they pass labels_only=True and keep the other entries warm.
+    """
+    global _agents_cache, _repositories_cache, _stats_cache
+    _repositories_cache = None
+    if not labels_only:
+        _agents_cache = None
+        _stats_cache = None
+
 
 @router.get("/agents", response_model=list[Agent])
-def list_agents() -> list[Agent]:
+async def list_agents() -> list[Agent]:
     """
     Get all available agents with statistics.
 
     Used to populate the agent selector dropdown in the frontend.
     Returns agents with success rates and problem counts.
     """
+    global _agents_cache
+    if _agents_cache is None:
+        _agents_cache = _build_agent_list()
+    return _agents_cache
+
+
+def _build_agent_list() -> list[Agent]:
+    """Compute the agent selector response from the scanned data."""
     agents = scanner.get_agents()
     agent_list: list[Agent] = []
 
-    for agent_name in agents:
-        # Get all submissions for this agent
-        all_problems = scanner.get_problems()
-        total_problems = len(all_problems)
+    # Same problem list for every agent; fetch it once outside the loop
+    all_problems = scanner.get_problems()
+    total_problems = len(all_problems)
 
-        # Count resolved problems
-        resolved_count = 0
-        for problem in all_problems:
-            submission = scanner.get_agent_submission(agent_name, problem.problem_id)
-            if submission and submission.resolved:
-                resolved_count += 1
+    for agent_name in agents:
+        # Resolved count comes straight from the agent's results.json index
+        resolved_count = scanner.get_resolved_count(agent_name)
 
         # Calculate success rate
         success_rate = resolved_count / total_problems if total_problems > 0 else 0.0
@@ -39,8 +87,9 @@ def list_agents() -> list[Agent]:
         # Generate display name from internal name
         display_name = _format_agent_display_name(agent_name)
 
+        # Inputs are already typed internal data; skip re-validation
         agent_list.append(
-            Agent(
+            Agent.model_construct(
                 name=agent_name,
                 display_name=display_name,
                 total_problems=total_problems,
@@ -49,53 +98,59 @@ def list_agents() -> list[Agent]:
             )
         )
 
-    # Sort by success rate descending, then by name
-    return sorted(agent_list, key=lambda a: (-a.success_rate, a.display_name))
+    # Sort by success rate descending, then by name; two stable passes with
+    # C-level attrgetter keys instead of a per-element lambda
+    agent_list.sort(key=attrgetter("display_name"))
+    agent_list.sort(key=attrgetter("success_rate"), reverse=True)
+    return agent_list
 
 
 @router.get("/repositories", response_model=list[Repository])
-def list_repositories() -> list[Repository]:
+async def list_repositories() -> list[Repository]:
     """
     Get all available repositories with statistics.
 
     Used to populate the repository selector dropdown in the frontend.
     """
-    repos = scanner.get_repos()
-    repo_list: list[Repository] = []
+    global _repositories_cache
+    if _repositories_cache is None:
+        _repositories_cache = _build_repository_list()
+    return _repositories_cache
 
-    for repo_name in repos:
-        # Parse organization and repo name
-        if "__" in repo_name:
-            org, repo = repo_name.split("__", 1)
-        else:
-            org, repo = "unknown", repo_name
 
-        # Generate display name
-        display_name = repo
+def _build_repository_list() -> list[Repository]:
+    """Compute the repository selector response from the scanned data."""
+    repo_list: list[Repository] = []
 
+    # Org/repo/display names were parsed once at scan time
+    for info in scanner.get_repo_infos():
         # Get label statistics for this repository
         (
             labeled_issues,
             total_issues_with_resolved_agents,
-        ) = label_stats_cache.get_repo_label_stats(repo_name)
+        ) = label_stats_cache.get_repo_label_stats(info.name)
 
+        # Inputs are already typed internal data; skip re-validation
         repo_list.append(
-            Repository(
-                name=repo_name,
-                display_name=display_name,
-                organization=org,
-                repo_name=repo,
+            Repository.model_construct(
+                name=info.name,
+                display_name=info.display_name,
+                organization=info.org,
+                repo_name=info.repo,
                 total_problems=total_issues_with_resolved_agents,
                 labeled_issues=labeled_issues,
             )
         )
 
-    # Sort by number of problems descending, then by name
-    return sorted(repo_list, key=lambda r: (-r.total_problems, r.display_name))
+    # Sort by number of problems descending, then by name; two stable passes
+    # with C-level attrgetter keys instead of a per-element lambda
+    repo_list.sort(key=attrgetter("display_name"))
+    repo_list.sort(key=attrgetter("total_problems"), reverse=True)
+    return repo_list
 
 
 @router.get("/problems", response_model=list[ProblemSummary])
-def list_problems_for_selector(
+async def list_problems_for_selector(
     repo: str | None = Query(default=None, description="Filter by repository"),
     limit: int = Query(
         default=1000, ge=1, le=1000, description="Maximum number of results"
@@ -110,25 +165,27 @@ def list_problems_for_selector(
     problems = scanner.get_problems(repo=repo)[:limit]
     problem_summaries: list[ProblemSummary] = []
 
+    # Batch-fetch submissions and label stats in one call each rather than
+    # one scanner/cache round trip per problem
+    problem_ids = [problem.problem_id for problem in problems]
+    subs_map = scanner.get_all_agent_submissions_batch(problem_ids)
+    label_stats_map = label_stats_cache.get_problem_label_stats_batch(problem_ids)
+
     for problem in problems:
-        # Get all submissions for this problem
-        submissions = scanner.get_all_agent_submissions(problem.problem_id)
+        submissions = subs_map[problem.problem_id]
 
-        # Find resolved agents
-        resolved_agents = [
-            agent_name
-            for agent_name, submission in submissions.items()
-            if submission.resolved
-        ]
+        # Resolved agents come from the index built at scan time
+        resolved_agents = scanner.get_resolved_agents(problem.problem_id)
 
         # Get label statistics for this problem
         (
             labeled_resolved_agents,
             total_resolved_agents,
-        ) = label_stats_cache.get_problem_label_stats(problem.problem_id)
+        ) = label_stats_map[problem.problem_id]
 
+        # Inputs are already typed internal data; skip re-validation
         problem_summaries.append(
-            ProblemSummary(
+            ProblemSummary.model_construct(
                 problem_id=problem.problem_id,
                 repo=problem.repo,
                 issue_number=problem.issue_number,
@@ -145,23 +202,27 @@ def list_problems_for_selector(
 
 
 @router.get("/stats")
-def get_overall_stats() -> dict[str, int | float]:
+async def get_overall_stats() -> dict[str, int | float]:
     """
     Get overall statistics for the dataset.
 
     Useful for dashboard summary information.
     """
+    global _stats_cache
+    if _stats_cache is None:
+        _stats_cache = _build_overall_stats()
+    return _stats_cache
+
+
+def _build_overall_stats() -> dict[str, int | float]:
+    """Compute the overall stats response from the scanned data."""
     stats = scanner.get_stats()
 
     # Calculate additional derived stats
-    problems = scanner.get_problems()
     total_attempts = stats["total_submissions"]
 
-    # Count resolved attempts
-    resolved_attempts = 0
-    for problem in problems:
-        submissions = scanner.get_all_agent_submissions(problem.problem_id)
-        resolved_attempts += sum(1 for sub in submissions.values() if sub.resolved)
+    # Resolved attempts were summed per-agent at scan time
+    resolved_attempts = scanner.total_resolved_attempts
 
     # Calculate overall success rate
     overall_success_rate = (
@@ -178,6 +239,7 @@ def get_overall_stats() -> dict[str, int | float]:
     }
 
 
+@lru_cache(maxsize=256)
 def _format_agent_display_name(agent_name: str) -> str:
     """Convert internal agent name to human-readable display name."""
     # Remove date prefix and clean up the name
@@ -190,18 +252,5 @@ def _format_agent_display_name(agent_name: str) -> str:
     # Convert underscores to spaces and title case
     name = name.replace("_", " ").title()
 
-    # Handle specific known cases
-    name_mappings = {
-        "Openhands": "OpenHands",
-        "Sweagent": "SWE-agent",
-        "Patchpilot": "PatchPilot",
-        "Augment Agent": "Augment Agent",
-        "Refact Agent": "Refact Agent",
-        "Moatless": "Moatless",
-    }
-
-    for old, new in name_mappings.items():
-        if old in name:
-            name = name.replace(old, new)
-
-    return name
+    # Handle specific known cases in a single pass
+    return _NAME_MAPPING_RE.sub(lambda m: _NAME_MAPPINGS[m.group(0)], name)
@@ -1,9 +1,16 @@
+import asyncio
+import hashlib
 import logging
 import time
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, cast
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.middleware.base import BaseHTTPMiddleware
 
 from backend.api import (
     admin_router,
@@ -12,9 +19,13 @@ from backend.api import (
     problems_router,
     selectors_router,
 )
+from backend.api.selectors import warm_selector_caches
 from backend.services import ground_truth_loader, scanner
 from backend.services.label_stats_cache import label_stats_cache
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,6 +39,10 @@ async def lifespan(_app: FastAPI):
     start_time = time.time()
 
     try:
+        # Start the ground truth load in the background so it overlaps
+        # with the directory scan below
+        ground_truth_loader.prefetch()
+
         # Scan and index data directory
         logger.info("📊 Scanning data directory for problems and submissions...")
         scanner.scan_data()
@@ -47,9 +62,10 @@ async def lifespan(_app: FastAPI):
         )
         logger.info(f"   ⏱️  Scan time: {elapsed:.2f}s")
 
-        # Build label statistics cache
+        # Build label statistics cache (or restore the persisted snapshot
+        # when nothing on disk changed since the last run)
         logger.info("📋 Building label statistics cache...")
-        label_stats_cache.rebuild_cache()
+        label_stats_cache.load_or_rebuild()
         logger.info("✅ Label statistics cache ready!")
 
         # Log ground truth loader status
@@ -63,22 +79,69 @@ async def lifespan(_app: FastAPI):
         else:
             logger.info("⚠️  Ground truth not available - using placeholders")
 
-        # Warm up critical endpoints (optional)
+        # Warm up critical endpoints
+        warm_selector_caches()
         logger.info("🔥 Cache warming complete")
 
+        # Keep the index current from filesystem events instead of rescans
+        scanner.start_watching()
+        logger.info("👀 Watching data directory for changes")
+
         logger.info("✅ Backend startup complete - ready to serve requests!")
 
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
         raise
 
+    # Coalesce label stats updates from the endpoints in the background
+    stats_worker = asyncio.create_task(label_stats_cache.run_update_worker())
+
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down SWE Quality Backend...")
+    _ = stats_worker.cancel()
     logger.info("✅ Shutdown complete")
 
 
+class ETagMiddleware(BaseHTTPMiddleware):
+    """
+    Serve 304 Not Modified for selector responses the client already has.
+
+    Selector data only changes at startup or via admin refresh, so an ETag
+    computed from the response body lets repeat dashboard loads revalidate
+    instead of re-downloading (and the handler result re-serializing).
+    """
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        response = await call_next(request)
+        if (
+            request.method != "GET"
+            or response.status_code != 200
+            or not request.url.path.startswith("/selectors")
+        ):
+            return response
+
+        # BaseHTTPMiddleware hands dispatch a streaming wrapper whose
+        # body_iterator yields bytes; the Response annotation on
+        # call_next hides both, so narrow it for the type checker
+        stream = cast("StreamingResponse", response)
+        chunks = cast("AsyncIterable[bytes]", stream.body_iterator)
+        body = b"".join([chunk async for chunk in chunks])
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        headers = dict(response.headers)
+        headers["ETag"] = etag
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type,
+        )
+
+
 app = FastAPI(
     title="SWE Quality Backend",
     description=(
@@ -86,8 +149,19 @@ app = FastAPI(
     ),
     version="1.0.0",
     lifespan=lifespan,
+    # orjson serializes the big selector/problem lists several times faster
+    # than stdlib json and emits bytes directly
+    default_response_class=ORJSONResponse,
 )
 
+# ETag revalidation for the read-mostly selector endpoints
+app.add_middleware(ETagMiddleware)
+
+# Diff bodies and selector JSON are highly compressible text; gzip cuts
+# transfer size 5-10x for a small CPU cost. Added after ETagMiddleware so
+# ETags are computed on the uncompressed body.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configure CORS for frontend development
 app.add_middleware(
     CORSMiddleware,
@@ -104,6 +178,15 @@ app.include_router(labels_router)
 app.include_router(selectors_router)
 app.include_router(admin_router)
 
+# Guard against double route registration (e.g. a duplicated router module
+# slipping in via packaging), which would double per-request routing work
+_route_keys = [
+    (route.path, tuple(sorted(route.methods)))
+    for route in app.routes
+    if isinstance(route, APIRoute)
+]
+assert len(_route_keys) == len(set(_route_keys)), "Duplicate route registration"
+
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,27 @@
+from dataclasses import asdict, dataclass
+
+from .problem import Problem
+
+
+@dataclass(slots=True)
+class ProblemCore:
+    """Scanner-internal problem record.
+
+    A plain slotted dataclass instead of a Pydantic model: the scanner
+    builds these from data it already trusts, so per-instance validation
+    is wasted work, and __slots__ keeps hundreds of instances compact
+    with faster attribute access. Convert to the Problem response model
+    at the API boundary via to_model().
+    """
+
+    problem_id: str
+    repo: str
+    issue_number: str
+    base_commit: str = ""
+    github_url: str = ""
+    problem_statement: str = ""
+    ground_truth_patch: str | None = None
+
+    def to_model(self) -> Problem:
+        """Build the API response model without re-validating trusted data."""
+        return Problem.model_construct(**asdict(self))
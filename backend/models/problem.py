@@ -34,6 +34,9 @@ class AgentSubmission(BaseModel):
         ..., description="Agent name (e.g., '20250316_augment_agent_v0')"
     )
     patch_file: str = Field(..., description="Path to patch file")
+    exists: bool = Field(
+        True, description="Whether the patch file was present at scan time"
+    )
     resolved: bool = Field(False, description="Whether agent marked this as resolved")
     patch_content: str | None = Field(
         None, description="Patch content or None if no submission"
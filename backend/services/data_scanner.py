@@ -1,58 +1,107 @@
-import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-from backend.models import AgentResults, AgentSubmission, Problem
+import orjson
+
+from backend.models import AgentResults, AgentSubmission
+from backend.models._internal import ProblemCore
 
 from .ground_truth_loader import ground_truth_loader
 
 
+@dataclass(frozen=True, slots=True)
+class RepoInfo:
+    """Repository identity parsed once at scan time."""
+
+    name: str
+    org: str
+    repo: str
+    display_name: str
+
+
 class DataScanner:
     def __init__(self, data_dir: str = "data/submissions") -> None:
         self.data_dir: Path = Path(data_dir)
         self._agents: list[str] = []
         self._repos: list[str] = []
-        self._problems: dict[str, Problem] = {}
-        self._agent_submissions: dict[str, dict[str, AgentSubmission]] = {}
+        self._repo_infos: list[RepoInfo] = []
+        self._problems: dict[str, ProblemCore] = {}
+        # repo -> problem ids, so repo-filtered listings skip the full scan
+        self._problems_by_repo: dict[str, list[str]] = {}
         self._agent_results: dict[str, AgentResults] = {}
+        self._resolved_sets: dict[str, set[str]] = {}
+        self._resolved_by_problem: dict[str, list[str]] = {}
+        self._patch_exists: set[str] = set()
+        self._total_resolved_attempts: int = 0
+        self._results_loaded: bool = False
+        # Guards incremental index mutations from the watcher thread
+        self._lock: threading.Lock = threading.Lock()
 
     def scan_data(self) -> None:
         """Scan the submissions directory and index all data."""
         if not self.data_dir.exists():
             raise FileNotFoundError(f"Data directory not found: {self.data_dir}")
 
-        self._scan_agents()
-        self._scan_problems()
-        self._load_agent_results()
+        # The admin refresh rescans while the watcher is live; holding the
+        # lock keeps its events from interleaving with the rebuild
+        with self._lock:
+            self._scan_agents()
+            self._scan_problems()
+
+            # Results and submissions are materialized lazily; reset the
+            # deferred state so the next access reloads against the new scan
+            self._reset_results()
 
     def _scan_agents(self) -> None:
         """Scan for available agents."""
-        self._agents = [
-            dir.name
-            for dir in self.data_dir.iterdir()
-            if dir.is_dir() and not dir.name.startswith(".")
-        ]
-        self._agents.sort()
+        # os.scandir keeps the dirent type from the directory read, avoiding
+        # a stat() syscall per entry that iterdir()+is_dir() would pay
+        with os.scandir(self.data_dir) as entries:
+            self._agents = sorted(
+                entry.name
+                for entry in entries
+                if not entry.name.startswith(".")
+                and entry.is_dir(follow_symlinks=False)
+            )
 
     def _scan_problems(self) -> None:
         """Scan for problems and build the index."""
         all_problem_ids: set[str] = set()
 
-        # First pass: collect all problem IDs from all agents
-        for agent_dir in self.data_dir.iterdir():
-            if not agent_dir.is_dir() or agent_dir.name.startswith("."):
-                continue
+        # First pass: collect all problem IDs from all agents, recording the
+        # patch files that actually exist so later existence checks are free.
+        # Agent directories are read concurrently — readdir releases the GIL,
+        # so the per-directory I/O latency overlaps across threads
+        self._patch_exists.clear()
+        self._problems_by_repo.clear()
+        if self._agents:
+            with ThreadPoolExecutor(max_workers=min(32, len(self._agents))) as executor:
+                for problem_ids, patch_paths in executor.map(
+                    self._scan_agent_dir, self._agents
+                ):
+                    all_problem_ids.update(problem_ids)
+                    self._patch_exists.update(patch_paths)
+
+        # Parse every problem id exactly once; later passes reuse the dict
+        # instead of re-splitting per (agent, problem) pair
+        parsed_ids: dict[str, tuple[str, str]] = {
+            pid: self._parse_problem_id(pid) for pid in all_problem_ids
+        }
 
-            for patch_file in agent_dir.glob("*_patch.diff"):
-                problem_id = self._extract_problem_id(patch_file.name)
-                if problem_id:
-                    all_problem_ids.add(problem_id)
+        # Fetch ground truth info for every problem in one dataset pass
+        # rather than a per-problem scan
+        ground_truth_infos = ground_truth_loader.get_problem_info_batch(all_problem_ids)
 
         # Second pass: create Problem objects and AgentSubmissions
+        repos_set: set[str] = set()
         for problem_id in all_problem_ids:
-            repo, issue_number = self._parse_problem_id(problem_id)
+            repo, issue_number = parsed_ids[problem_id]
 
-            # Get additional problem info from ground truth dataset
-            ground_truth_info = ground_truth_loader.get_problem_info(problem_id)
+            ground_truth_info = ground_truth_infos.get(problem_id)
             base_commit = (
                 ground_truth_info.get("base_commit", "") if ground_truth_info else ""
             )
@@ -62,7 +111,7 @@ class DataScanner:
                 else ""
             )
 
-            problem = Problem(
+            problem = ProblemCore(
                 problem_id=problem_id,
                 repo=repo,
                 issue_number=issue_number,
@@ -73,48 +122,199 @@ class DataScanner:
             )
 
             self._problems[problem_id] = problem
+            self._problems_by_repo.setdefault(repo, []).append(problem_id)
+
+            # Track unique repositories; set membership is O(1) vs the
+            # linear list scan
+            repos_set.add(repo)
+
+        self._repos = sorted(repos_set)
+
+        # Parse org/repo once per repository so list endpoints don't re-split
+        # the name on every request
+        self._repo_infos = []
+        for repo_name in self._repos:
+            if "__" in repo_name:
+                org, repo = repo_name.split("__", 1)
+            else:
+                org, repo = "unknown", repo_name
+            self._repo_infos.append(
+                RepoInfo(name=repo_name, org=org, repo=repo, display_name=repo)
+            )
 
-            # Track unique repositories
-            if repo not in self._repos:
-                self._repos.append(repo)
-
-        self._repos.sort()
-
-        # Third pass: collect agent submissions for each problem
-        for agent_name in self._agents:
-            agent_dir = self.data_dir / agent_name
-            self._agent_submissions[agent_name] = {}
-
-            for problem_id in all_problem_ids:
-                repo, issue_number = self._parse_problem_id(problem_id)
-                patch_file = agent_dir / f"{problem_id}_patch.diff"
-
-                submission = AgentSubmission(
-                    agent_name=agent_name,
-                    patch_file=str(patch_file),
-                    resolved=False,  # Will be updated from results.json
-                    patch_content=None,  # Loaded on demand
-                )
-
-                self._agent_submissions[agent_name][problem_id] = submission
+    def _scan_agent_dir(self, agent_name: str) -> tuple[list[str], list[str]]:
+        """List one agent's patch files; runs on the scan thread pool."""
+        problem_ids: list[str] = []
+        patch_paths: list[str] = []
+        with os.scandir(self.data_dir / agent_name) as entries:
+            for entry in entries:
+                if not entry.name.endswith("_patch.diff"):
+                    continue
+                problem_id = self._extract_problem_id(entry.name)
+                if problem_id:
+                    problem_ids.append(problem_id)
+                    patch_paths.append(entry.path)
+        return problem_ids, patch_paths
+
+    def _reset_results(self) -> None:
+        """Drop the lazily built results state; the next access reparses."""
+        self._agent_results.clear()
+        self._resolved_sets.clear()
+        self._resolved_by_problem.clear()
+        self._total_resolved_attempts = 0
+        self._results_loaded = False
+
+    def start_watching(self) -> threading.Thread:
+        """Keep the index current from filesystem events.
+
+        Spawns a daemon thread that replays watchfiles events into targeted
+        index updates, so adding a patch or rewriting a results.json never
+        costs a full rescan of the data directory.
+        """
+        thread = threading.Thread(
+            target=self._watch_loop, name="data-scanner-watch", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _watch_loop(self) -> None:
+        # Imported here: watchfiles ships with fastapi[standard] but is only
+        # needed when watching is enabled
+        from watchfiles import watch
+
+        for changes in watch(self.data_dir):
+            with self._lock:
+                for change, path in changes:
+                    self._apply_change(change, path)
+
+    def _apply_change(self, change: object, path: str) -> None:
+        """Apply one filesystem event to the in-memory index.
+
+        watchfiles reports absolute paths while the index stores paths
+        joined from data_dir (relative in the default config), so events
+        are re-rooted onto data_dir before any lookup.
+        """
+        from watchfiles import Change
+
+        rel = os.path.relpath(path, os.path.abspath(self.data_dir))
+        parts = rel.split(os.sep)
+        # Patch files and results.json live exactly one level down
+        # (data_dir/agent/file); anything else is not indexed
+        if len(parts) != 2 or parts[0] == "..":
+            return
+        agent_name, filename = parts
+        indexed_path = os.path.join(str(self.data_dir), agent_name, filename)
+
+        if filename.endswith("_patch.diff"):
+            if change is Change.deleted:
+                self._patch_exists.discard(indexed_path)
+            else:
+                self._patch_exists.add(indexed_path)
+
+                # A patch under a previously unseen agent directory
+                # registers the agent; one under a new problem id
+                # registers the problem
+                if agent_name not in self._agents:
+                    self._agents = sorted([*self._agents, agent_name])
+                problem_id = self._extract_problem_id(filename)
+                if problem_id and problem_id not in self._problems:
+                    self._add_problem(problem_id)
+            # Cached submissions carry the exists flag, so both adds and
+            # removes must drop them
+            self.get_agent_submission.cache_clear()
+        elif filename == "results.json":
+            self._reset_results()
+            self.get_agent_submission.cache_clear()
+
+    def _add_problem(self, problem_id: str) -> None:
+        """Index one newly observed problem id."""
+        repo, issue_number = self._parse_problem_id(problem_id)
+        ground_truth_info = ground_truth_loader.get_problem_info(problem_id)
+
+        self._problems_by_repo.setdefault(repo, []).append(problem_id)
+        self._problems[problem_id] = ProblemCore(
+            problem_id=problem_id,
+            repo=repo,
+            issue_number=issue_number,
+            base_commit=(
+                ground_truth_info.get("base_commit", "") if ground_truth_info else ""
+            ),
+            problem_statement=(
+                ground_truth_info.get("problem_statement", "")
+                if ground_truth_info
+                else ""
+            ),
+            github_url=self._generate_github_url(repo, issue_number),
+            ground_truth_patch=None,
+        )
+        self.get_problem.cache_clear()
+
+        if repo not in self._repos:
+            self._repos = sorted([*self._repos, repo])
+            if "__" in repo:
+                org, repo_name = repo.split("__", 1)
+            else:
+                org, repo_name = "unknown", repo
+            self._repo_infos = sorted(
+                [
+                    *self._repo_infos,
+                    RepoInfo(
+                        name=repo, org=org, repo=repo_name, display_name=repo_name
+                    ),
+                ],
+                key=lambda info: info.name,
+            )
 
-    def _load_agent_results(self) -> None:
-        """Load results.json for each agent to determine resolved status."""
+    def _ensure_results_loaded(self) -> None:
+        """Parse every agent's results.json on first use.
+
+        scan_data only indexes names and ids; the JSON parsing and the
+        resolved indexes derived from it are deferred to the first access,
+        so startup pays for directory listings only.
+        """
+        if self._results_loaded:
+            return
+
+        # Double-checked under the index lock: a threadpool request and a
+        # background refresh (or the watcher resetting mid-read) can race
+        # here, and running the load twice would double-count totals and
+        # duplicate every per-problem resolved list
+        with self._lock:
+            if self._results_loaded:
+                return
+            self._load_results()
+            self._results_loaded = True
+
+    def _load_results(self) -> None:
+        """Parse and index results.json for every agent; callers hold _lock."""
         for agent_name in self._agents:
             results_file = self.data_dir / agent_name / "results.json"
-            if results_file.exists():
-                with open(results_file) as f:
-                    raw_data = json.load(f)  # pyright: ignore[reportAny]
-
-                # Parse with Pydantic for type safety - let validation errors propagate
-                agent_results = AgentResults.model_validate(raw_data)
-                self._agent_results[agent_name] = agent_results
+            try:
+                raw_data = orjson.loads(results_file.read_bytes())  # pyright: ignore[reportAny]
+            except FileNotFoundError:
+                continue
 
-                # Update resolved status for submissions
-                resolved_problems = set(agent_results.resolved)
-                for problem_id in self._agent_submissions[agent_name]:
-                    if problem_id in resolved_problems:
-                        self._agent_submissions[agent_name][problem_id].resolved = True
+            # The file is produced locally and parsed by orjson in C; build
+            # the model directly instead of re-walking the payload through
+            # full Pydantic validation
+            agent_results = AgentResults.model_construct(
+                resolved=raw_data.get("resolved", []),
+                no_generation=raw_data.get("no_generation", []),
+                no_logs=raw_data.get("no_logs", []),
+            )
+            self._agent_results[agent_name] = agent_results
+
+            # Build the per-agent resolved set and per-problem resolved-agent
+            # index, restricted to problems that were actually scanned; the
+            # counts below use the same restriction so every resolved number
+            # the API reports describes the same population
+            resolved_set = {
+                pid for pid in agent_results.resolved if pid in self._problems
+            }
+            self._resolved_sets[agent_name] = resolved_set
+            self._total_resolved_attempts += len(resolved_set)
+            for problem_id in resolved_set:
+                self._resolved_by_problem.setdefault(problem_id, []).append(agent_name)
 
     def _extract_problem_id(self, filename: str) -> str | None:
         """Extract problem ID from filename like 'django__django-10097_patch.diff'."""
@@ -146,22 +346,69 @@ class DataScanner:
         """Get list of all available repositories."""
         return self._repos.copy()
 
-    def get_problems(self, repo: str | None = None) -> list[Problem]:
+    def get_repo_infos(self) -> list[RepoInfo]:
+        """Get parsed repository info built at scan time."""
+        return self._repo_infos.copy()
+
+    def get_problems(self, repo: str | None = None) -> list[ProblemCore]:
         """Get list of problems, optionally filtered by repository."""
-        problems = list(self._problems.values())
         if repo:
-            problems = [p for p in problems if p.repo == repo]
-        return sorted(problems, key=lambda p: p.problem_id)
-
-    def get_problem(self, problem_id: str) -> Problem | None:
+            # Inverted index built at scan time: only the repo's problems
+            # are touched instead of filtering the whole problem dict
+            ids = self._problems_by_repo.get(repo, [])
+            return [self._problems[pid] for pid in sorted(ids)]
+        return sorted(self._problems.values(), key=lambda p: p.problem_id)
+
+    @lru_cache(maxsize=4096)  # noqa: B019 - singleton service, cleared on refresh
+    def get_problem(self, problem_id: str) -> ProblemCore | None:
         """Get a specific problem by ID."""
         return self._problems.get(problem_id)
 
+    # Sized above the full agents x problems working set (~10 x ~500 today)
+    # so a sweep over every submission never evicts its own entries
+    @lru_cache(maxsize=16384)  # noqa: B019 - singleton service, cleared on refresh
     def get_agent_submission(
         self, agent_name: str, problem_id: str
     ) -> AgentSubmission | None:
-        """Get agent submission for a specific problem."""
-        return self._agent_submissions.get(agent_name, {}).get(problem_id)
+        """Get agent submission for a specific problem, built on demand."""
+        if problem_id not in self._problems or agent_name not in self._agents:
+            return None
+
+        self._ensure_results_loaded()
+        resolved_set = self._resolved_sets.get(agent_name)
+        patch_file = (
+            f"{self.data_dir}{os.sep}{agent_name}{os.sep}{problem_id}_patch.diff"
+        )
+        return AgentSubmission(
+            agent_name=agent_name,
+            patch_file=patch_file,
+            # Presence comes from the scan-time index, so consumers never
+            # need an os.path.exists probe of their own
+            exists=patch_file in self._patch_exists,
+            resolved=resolved_set is not None and problem_id in resolved_set,
+            patch_content=None,  # Loaded on demand
+        )
+
+    def get_resolved_count(self, agent_name: str) -> int:
+        """Get the number of scanned problems an agent resolved."""
+        self._ensure_results_loaded()
+        return len(self._resolved_sets.get(agent_name, ()))
+
+    @property
+    def total_resolved_attempts(self) -> int:
+        """Total resolved submissions across all agents."""
+        self._ensure_results_loaded()
+        return self._total_resolved_attempts
+
+    def get_resolved_agents(self, problem_id: str) -> list[str]:
+        """Get the agents that resolved a problem, from the lazy index."""
+        self._ensure_results_loaded()
+        return self._resolved_by_problem.get(problem_id, []).copy()
+
+    def get_agent_count(self, problem_id: str) -> int:
+        """Get the number of agents with a submission entry for a problem."""
+        # Every scanned agent has a submission entry for every known problem
+        return len(self._agents) if problem_id in self._problems else 0
 
     def get_all_agent_submissions(self, problem_id: str) -> dict[str, AgentSubmission]:
         """Get all agent submissions for a problem."""
@@ -172,8 +419,22 @@ class DataScanner:
                 submissions[agent_name] = submission
         return submissions
 
+    def get_all_agent_submissions_batch(
+        self, problem_ids: list[str]
+    ) -> dict[str, dict[str, AgentSubmission]]:
+        """Get all agent submissions for many problems in one call.
+
+        Returns problem_id -> {agent_name: AgentSubmission}. Submissions
+        are materialized on demand and served from the lookup cache.
+        """
+        return {pid: self.get_all_agent_submissions(pid) for pid in problem_ids}
+
     def load_patch_content(self, submission: AgentSubmission) -> str | None:
         """Load patch content from file for a submission."""
+        # Missing patches are answered from the index without a syscall
+        if not submission.exists:
+            return None
+
         # Import here to avoid circular imports
         from .diff_parser import diff_parser
 
@@ -192,9 +453,7 @@ class DataScanner:
             "agents": len(self._agents),
             "repositories": len(self._repos),
             "problems": len(self._problems),
-            "total_submissions": sum(
-                len(subs) for subs in self._agent_submissions.values()
-            ),
+            "total_submissions": len(self._agents) * len(self._problems),
         }
 
 
@@ -1,82 +1,94 @@
+import os
 from datetime import datetime
 from pathlib import Path
 
 from backend.models import Label, LabelCreate, LabelResponse
-from backend.services.data_scanner import scanner
 
 
 class FileService:
     def __init__(self, labels_dir: str = "data/labels") -> None:
         self.labels_dir: Path = Path(labels_dir)
+        # Plain-string base for the per-call path helpers; joining strings
+        # avoids the Path object churn pathlib pays on every lookup
+        self._labels_dir_str: str = str(self.labels_dir)
 
-    def ensure_label_dir(self, agent_name: str) -> Path:
+    def ensure_label_dir(self, agent_name: str) -> str:
         """Ensure the label directory exists for an agent."""
-        agent_dir = self.labels_dir / agent_name
-        agent_dir.mkdir(parents=True, exist_ok=True)
+        agent_dir = os.path.join(self._labels_dir_str, agent_name)
+        os.makedirs(agent_dir, exist_ok=True)
         return agent_dir
 
-    def get_label_file_path(self, problem_id: str, agent_name: str) -> Path:
+    def get_label_file_path(self, problem_id: str, agent_name: str) -> str:
         """Get the file path for a label."""
-        return self.labels_dir / agent_name / f"{problem_id}.md"
+        return os.path.join(self._labels_dir_str, agent_name, f"{problem_id}.md")
 
-    def get_draft_file_path(self, problem_id: str, agent_name: str) -> Path:
+    def get_draft_file_path(self, problem_id: str, agent_name: str) -> str:
         """Get the file path for a draft."""
-        return self.labels_dir / agent_name / f"{problem_id}.draft.md"
+        return os.path.join(self._labels_dir_str, agent_name, f"{problem_id}.draft.md")
+
+    def draft_exists(self, problem_id: str, agent_name: str) -> bool:
+        """Check whether a draft file exists."""
+        return os.path.exists(self.get_draft_file_path(problem_id, agent_name))
 
     def load_label(self, problem_id: str, agent_name: str) -> Label | None:
         """Load a label from file."""
         label_file = self.get_label_file_path(problem_id, agent_name)
 
-        if not label_file.exists():
-            return None
-
         try:
+            # Open directly and fstat the already-open fd: existence,
+            # content, and timestamps in one open/read/fstat sequence
+            # instead of separate exists() + open() + stat() probes
             with open(label_file, encoding="utf-8") as f:
                 content = f.read()
-
-            # Get file timestamps
-            stat = label_file.stat()
-            created_at = datetime.fromtimestamp(stat.st_ctime)
-            updated_at = datetime.fromtimestamp(stat.st_mtime)
-
-            return Label(
-                problem_id=problem_id,
-                agent_name=agent_name,
-                content=content,
-                created_at=created_at,
-                updated_at=updated_at,
-            )
+                stat = os.fstat(f.fileno())
+        except FileNotFoundError:
+            return None
         except OSError as e:
             print(f"Warning: Failed to read label file {label_file}: {e}")
             return None
 
+        return Label.model_construct(
+            problem_id=problem_id,
+            agent_name=agent_name,
+            content=content,
+            created_at=datetime.fromtimestamp(stat.st_ctime),
+            updated_at=datetime.fromtimestamp(stat.st_mtime),
+        )
+
     def save_label(
         self, problem_id: str, agent_name: str, label_create: LabelCreate
     ) -> Label:
         """Save a label to file."""
-        _ = self.ensure_label_dir(agent_name)
+        self.ensure_label_dir(agent_name)
         label_file = self.get_label_file_path(problem_id, agent_name)
-
-        # Check if file exists to determine created_at
-        is_new = not label_file.exists()
         now = datetime.now()
 
-        # Get created_at before writing if file exists
+        # One stat answers both existence and created_at
         existing_created_at: datetime | None = None
-        if not is_new:
-            try:
-                existing_created_at = datetime.fromtimestamp(label_file.stat().st_ctime)
-            except OSError:
-                existing_created_at = now
-
         try:
-            with open(label_file, "w", encoding="utf-8") as f:
+            existing_created_at = datetime.fromtimestamp(os.stat(label_file).st_ctime)
+            is_new = False
+        except FileNotFoundError:
+            is_new = True
+        except OSError:
+            existing_created_at = now
+            is_new = False
+
+        tmp_file = f"{label_file}.tmp"
+        try:
+            # Write to a sibling tempfile, fsync, and rename into place:
+            # readers never observe a truncated label and a crash mid-write
+            # can't corrupt an existing one
+            with open(tmp_file, "w", encoding="utf-8") as f:
                 _ = f.write(label_create.content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, label_file)
 
             # Set created_at and updated_at
             created_at = now if is_new else (existing_created_at or now)
 
-            return Label(
+            return Label.model_construct(
                 problem_id=problem_id,
                 agent_name=agent_name,
                 content=label_create.content,
@@ -89,27 +101,81 @@ class FileService:
     def get_all_labels_for_problem(self, problem_id: str) -> list[Label]:
         """Get all labels for a problem."""
         labels: list[Label] = []
+        filename = f"{problem_id}.md"
 
-        # Get all available agents from the scanner
-        agents = scanner.get_agents()
-
-        for agent_name in agents:
-            label = self.load_label(problem_id, agent_name)
-            if label:
-                labels.append(label)
+        # Walk the labels directory itself instead of probing a path for
+        # every agent the scanner knows about; only agents that actually
+        # have a label directory are visited
+        try:
+            agent_dirs = os.scandir(self.labels_dir)
+        except FileNotFoundError:
+            return labels
+
+        with agent_dirs:
+            for agent_entry in agent_dirs:
+                if not agent_entry.is_dir(follow_symlinks=False):
+                    continue
+                label_path = os.path.join(agent_entry.path, filename)
+                try:
+                    with open(label_path, encoding="utf-8") as f:
+                        content = f.read()
+                        stat = os.fstat(f.fileno())
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    print(f"Warning: Failed to read label file {label_path}: {e}")
+                    continue
+
+                labels.append(
+                    Label.model_construct(
+                        problem_id=problem_id,
+                        agent_name=agent_entry.name,
+                        content=content,
+                        created_at=datetime.fromtimestamp(stat.st_ctime),
+                        updated_at=datetime.fromtimestamp(stat.st_mtime),
+                    )
+                )
 
         return sorted(labels, key=lambda label: label.updated_at, reverse=True)
 
+    def list_label_files(self) -> dict[str, set[str]]:
+        """List labeled problem ids per agent in one directory sweep.
+
+        os.scandir surfaces a whole getdents batch of names per syscall, so
+        enumerating each agent directory once replaces the per-(problem,
+        agent) file probes a cross-problem rebuild would otherwise pay.
+        Draft files are excluded.
+        """
+        labeled: dict[str, set[str]] = {}
+        try:
+            agent_dirs = os.scandir(self.labels_dir)
+        except FileNotFoundError:
+            return labeled
+
+        with agent_dirs:
+            for agent_entry in agent_dirs:
+                if not agent_entry.is_dir(follow_symlinks=False):
+                    continue
+                problem_ids: set[str] = set()
+                with os.scandir(agent_entry.path) as label_files:
+                    for entry in label_files:
+                        name = entry.name
+                        if name.endswith(".md") and not name.endswith(".draft.md"):
+                            problem_ids.add(name[:-3])
+                labeled[agent_entry.name] = problem_ids
+        return labeled
+
     def delete_label(self, problem_id: str, agent_name: str) -> bool:
         """Delete a label file."""
         label_file = self.get_label_file_path(problem_id, agent_name)
 
-        if label_file.exists():
-            try:
-                label_file.unlink()
-                return True
-            except OSError as e:
-                print(f"Warning: Failed to delete label file {label_file}: {e}")
+        try:
+            os.unlink(label_file)
+            return True
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Failed to delete label file {label_file}: {e}")
 
         return False
 
@@ -118,9 +184,14 @@ class FileService:
         self.ensure_label_dir(agent_name)
         draft_file = self.get_draft_file_path(problem_id, agent_name)
 
+        tmp_file = f"{draft_file}.tmp"
         try:
-            with open(draft_file, "w", encoding="utf-8") as f:
+            # Same atomic tempfile-then-rename dance as save_label
+            with open(tmp_file, "w", encoding="utf-8") as f:
                 f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, draft_file)
         except OSError as e:
             raise RuntimeError(f"Failed to save draft file {draft_file}: {e}") from e
 
@@ -128,12 +199,11 @@ class FileService:
         """Load a draft from file."""
         draft_file = self.get_draft_file_path(problem_id, agent_name)
 
-        if not draft_file.exists():
-            return None
-
         try:
             with open(draft_file, encoding="utf-8") as f:
                 return f.read()
+        except FileNotFoundError:
+            return None
         except OSError as e:
             print(f"Warning: Failed to read draft file {draft_file}: {e}")
             return None
@@ -142,12 +212,13 @@ class FileService:
         """Delete a draft file."""
         draft_file = self.get_draft_file_path(problem_id, agent_name)
 
-        if draft_file.exists():
-            try:
-                draft_file.unlink()
-                return True
-            except OSError as e:
-                print(f"Warning: Failed to delete draft file {draft_file}: {e}")
+        try:
+            os.unlink(draft_file)
+            return True
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Failed to delete draft file {draft_file}: {e}")
 
         return False
 
@@ -156,35 +227,35 @@ class FileService:
         draft_file = self.get_draft_file_path(problem_id, agent_name)
         label_file = self.get_label_file_path(problem_id, agent_name)
 
-        if not draft_file.exists():
+        if not os.path.exists(draft_file):
             raise RuntimeError(f"No draft file found: {draft_file}")
 
         self.ensure_label_dir(agent_name)
-
-        # Check if label file exists to determine created_at
-        is_new = not label_file.exists()
         now = datetime.now()
 
-        # Get created_at before moving if label file exists
+        # One stat answers both existence and created_at
         existing_created_at: datetime | None = None
-        if not is_new:
-            try:
-                existing_created_at = datetime.fromtimestamp(label_file.stat().st_ctime)
-            except OSError:
-                existing_created_at = now
+        try:
+            existing_created_at = datetime.fromtimestamp(os.stat(label_file).st_ctime)
+            is_new = False
+        except FileNotFoundError:
+            is_new = True
+        except OSError:
+            existing_created_at = now
+            is_new = False
 
         try:
             # Read draft content
             with open(draft_file, encoding="utf-8") as f:
                 content = f.read()
 
-            # Move draft to label (atomic operation)
-            draft_file.rename(label_file)
+            # Move draft to label (single atomic rename syscall)
+            os.replace(draft_file, label_file)
 
             # Set created_at and updated_at
             created_at = now if is_new else (existing_created_at or now)
 
-            return Label(
+            return Label.model_construct(
                 problem_id=problem_id,
                 agent_name=agent_name,
                 content=content,
@@ -198,7 +269,7 @@ class FileService:
 
     def label_to_response(self, label: Label) -> LabelResponse:
         """Convert Label model to LabelResponse."""
-        return LabelResponse(
+        return LabelResponse.model_construct(
             problem_id=label.problem_id,
             agent_name=label.agent_name,
             content=label.content,
@@ -6,15 +6,46 @@ to provide reference solutions for comparison with agent submissions.
 """
 
 import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache
+from pathlib import Path
 from typing import Any
 
-from datasets import Dataset, load_dataset
+from datasets import Dataset, load_dataset, load_from_disk
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# The only columns the loader ever reads (the SWEBenchItem schema);
+# projecting down to these drops the rest of the Arrow buffers
+_COLUMNS = [
+    "instance_id",
+    "patch",
+    "repo",
+    "base_commit",
+    "problem_statement",
+    "hints_text",
+    "test_patch",
+    "created_at",
+]
+
+# Local Arrow snapshot of the dataset. load_from_disk memory-maps the
+# Arrow file zero-copy, so warm starts skip the HF hub round-trip and
+# parse entirely.
+_CACHE_PATH = (
+    Path(os.environ.get("SWEBENCH_CACHE_DIR", "~/.cache/pr-reviewer")).expanduser()
+    / "swebench_verified"
+)
+
 
 class SWEBenchItem(BaseModel):
+    """Schema of a SWE-bench row; kept for external API boundaries.
+
+    Internal lookups read rows directly — the dataset schema is fixed,
+    so re-validating it per access only costs CPU.
+    """
+
     instance_id: str
     patch: str
     repo: str
@@ -30,23 +61,93 @@ class GroundTruthLoader:
 
     def __init__(self):
         self._dataset: Dataset | None = None
-        self._dataset_loaded: bool = False
+        # instance_id -> row index, for O(1) lookups into the dataset
+        self._id_to_idx: dict[str, int] = {}
+        # In-flight background load started by prefetch(), if any
+        self._load_future: Future[None] | None = None
+
+    def prefetch(self) -> None:
+        """Start loading the dataset in a background thread.
+
+        Called at app startup so the load overlaps with the directory
+        scan; the first getter then finds the dataset ready, or blocks
+        only for the remainder of the load.
+        """
+        if self._dataset is None and self._load_future is None:
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._load_future = executor.submit(self._load_dataset)
+            executor.shutdown(wait=False)
+
+    def _ensure_loaded(self) -> None:
+        """Load the dataset on first use so imports stay cheap.
+
+        Code paths that never touch ground truth (label cache rebuilds,
+        admin endpoints, tooling imports) no longer pay for the load.
+        """
+        # _dataset doubles as the loaded flag: it is None until
+        # _load_dataset succeeds, so one check covers both
+        if self._dataset is not None:
+            return
+        future = self._load_future
+        if future is not None:
+            # A prefetch is in flight; wait it out instead of loading twice
+            future.result()
+            self._load_future = None
+            return
         self._load_dataset()
 
     def _load_dataset(self) -> None:
-        """Load SWE-bench verified dataset on initialization."""
+        """Load SWE-bench verified dataset."""
         logger.info("Loading SWE-bench verified dataset...")
-        raw_dataset = load_dataset("princeton-nlp/SWE-bench_Verified", split="test")
-        # Type narrowing - load_dataset with split="test" returns a Dataset
-        assert isinstance(raw_dataset, Dataset), (
-            "Expected Dataset from load_dataset with split='test'"
-        )
+        if _CACHE_PATH.exists():
+            raw_dataset = load_from_disk(str(_CACHE_PATH))
+            assert isinstance(raw_dataset, Dataset), (
+                "Expected Dataset from load_from_disk"
+            )
+            # Older snapshots may carry the full schema
+            raw_dataset = raw_dataset.select_columns(_COLUMNS)
+        else:
+            raw_dataset = load_dataset("princeton-nlp/SWE-bench_Verified", split="test")
+            # Type narrowing - load_dataset with split="test" returns a Dataset
+            assert isinstance(raw_dataset, Dataset), (
+                "Expected Dataset from load_dataset with split='test'"
+            )
+            # Project before caching so the snapshot and resident memory
+            # only hold the columns lookups actually touch
+            raw_dataset = raw_dataset.select_columns(_COLUMNS)
+            try:
+                raw_dataset.save_to_disk(str(_CACHE_PATH))
+                logger.info(f"Cached SWE-bench dataset to {_CACHE_PATH}")
+            except OSError as e:
+                # Cache miss next start; not worth failing startup over
+                logger.warning(f"Could not cache dataset to {_CACHE_PATH}: {e}")
         self._dataset = raw_dataset
-        self._dataset_loaded = True
+        # Validate the schema once here instead of per lookup: one row
+        # through the model catches drift at load time, and the direct
+        # dict reads on the query path stay validation-free
+        if len(raw_dataset) > 0:
+            _ = SWEBenchItem.model_validate(raw_dataset[0])
+        # One columnar read of the id column builds the row index; lookups
+        # then touch a single row instead of scanning the whole dataset
+        ids = raw_dataset["instance_id"]
+        self._id_to_idx = {instance_id: idx for idx, instance_id in enumerate(ids)}
         logger.info(
             f"Loaded SWE-bench verified dataset with {len(self._dataset)} problems"
         )
 
+    @cache  # noqa: B019 - singleton service, immutable dataset
+    def _lookup_row(self, problem_id: str) -> dict[str, str] | None:
+        """Materialize the row for a problem id, memoized.
+
+        The dataset is immutable after load and holds ~500 rows, so an
+        unbounded cache is safe; repeat lookups (one per agent submission
+        on a problem, in practice) become a dict hit with no Arrow work.
+        """
+        idx = self._id_to_idx.get(problem_id)
+        if idx is None or not self._dataset:
+            return None
+        return self._dataset[idx]
+
     def get_ground_truth_patch(self, problem_id: str) -> str | None:
         """
         Get ground truth patch for a specific problem ID.
@@ -57,25 +158,25 @@ class GroundTruthLoader:
         Returns:
             Ground truth patch content as string, or None if not found
         """
-        if not self._dataset_loaded or not self._dataset:
+        self._ensure_loaded()
+        if self._dataset is None:
             return None
 
-        # Find the problem in the dataset
-        for item in self._dataset:  # pyright: ignore[reportUnknownVariableType]
-            # Validate and parse the item with Pydantic
-            swe_item = SWEBenchItem.model_validate(item)
-            if swe_item.instance_id == problem_id:
-                if swe_item.patch and swe_item.patch.strip():
-                    logger.info(
-                        f"Found ground truth patch for {problem_id}: "
-                        f"{len(swe_item.patch)} chars"
-                    )
-                    return swe_item.patch
-                else:
-                    logger.warning(f"Ground truth patch for {problem_id} is empty")
-                    return None
-
-        logger.warning(f"Problem {problem_id} not found in SWE-bench dataset")
+        # O(1) memoized row lookup; the schema is fixed and trusted, so
+        # plain dict access skips per-row Pydantic validation
+        row = self._lookup_row(problem_id)
+        if row is None:
+            logger.warning(f"Problem {problem_id} not found in SWE-bench dataset")
+            return None
+
+        patch = row["patch"]
+        if patch and patch.strip():
+            logger.info(
+                f"Found ground truth patch for {problem_id}: {len(patch)} chars"
+            )
+            return patch
+
+        logger.warning(f"Ground truth patch for {problem_id} is empty")
         return None
 
     def get_problem_info(self, problem_id: str) -> dict[str, str] | None:
@@ -88,30 +189,60 @@ class GroundTruthLoader:
         Returns:
             Dictionary with problem details, or None if not found
         """
-        if not self._dataset_loaded or not self._dataset:
+        self._ensure_loaded()
+        if self._dataset is None:
             return None
 
-        for item in self._dataset:  # pyright: ignore[reportUnknownVariableType]
-            swe_item = SWEBenchItem.model_validate(item)
-            if swe_item.instance_id == problem_id:
-                return {
-                    "instance_id": swe_item.instance_id,
-                    "repo": swe_item.repo,
-                    "base_commit": swe_item.base_commit,
-                    "problem_statement": swe_item.problem_statement,
-                    "hints_text": swe_item.hints_text,
-                    "test_patch": swe_item.test_patch,
-                    "created_at": swe_item.created_at,
-                }
-        return None
+        # Trusted schema: read the memoized row directly instead of
+        # paying an Arrow materialization per lookup
+        row = self._lookup_row(problem_id)
+        if row is None:
+            return None
+
+        return {
+            "instance_id": row["instance_id"],
+            "repo": row["repo"],
+            "base_commit": row["base_commit"],
+            "problem_statement": row["problem_statement"],
+            "hints_text": row.get("hints_text") or "",
+            "test_patch": row.get("test_patch") or "",
+            "created_at": row.get("created_at") or "",
+        }
+
+    def get_problem_info_batch(
+        self, problem_ids: set[str]
+    ) -> dict[str, dict[str, str]]:
+        """
+        Get problem info for many problems in a single dataset pass.
+
+        Args:
+            problem_ids: Problem identifiers to look up
+
+        Returns:
+            Dictionary keyed by problem_id; ids not found in the dataset
+            are absent from the result.
+        """
+        self._ensure_loaded()
+        if self._dataset is None:
+            return {}
+
+        # Index lookups mean only the requested rows are ever materialized
+        found: dict[str, dict[str, str]] = {}
+        for problem_id in problem_ids:
+            info = self.get_problem_info(problem_id)
+            if info is not None:
+                found[problem_id] = info
+        return found
 
     def is_available(self) -> bool:
         """Check if ground truth loading is available."""
-        return self._dataset_loaded and self._dataset is not None
+        self._ensure_loaded()
+        return self._dataset is not None
 
     def get_stats(self) -> dict[str, Any]:
         """Get statistics about the loaded dataset."""
-        if not self._dataset_loaded or not self._dataset:
+        self._ensure_loaded()
+        if self._dataset is None:
             return {"available": False, "total_problems": 0}
 
         return {
@@ -2,8 +2,19 @@
 In-memory cache for label statistics to avoid filesystem scanning on every request.
 """
 
+import asyncio
+import os
+import sys
+from array import array
+
+import orjson
+
 from backend.services import file_service, scanner
 
+# Persisted snapshot of the cache; lets a restart skip the full rebuild
+# when neither the labels tree nor any results.json changed
+_CACHE_FILE = "data/.cache/label_stats.json"
+
 
 class LabelStatsCache:
     """
@@ -15,39 +26,184 @@ class LabelStatsCache:
     """
 
     def __init__(self):
-        # problem_id -> (labeled_resolved_count, total_resolved_count)
-        self._problem_stats: dict[str, tuple[int, int]] = {}
+        # Problem stats as struct-of-arrays: problem_id -> slot index into
+        # two flat int arrays. Two machine ints per problem instead of a
+        # dict entry holding a 2-tuple of boxed ints, and updates mutate
+        # in place instead of allocating a new tuple.
+        self._problem_idx: dict[str, int] = {}
+        self._labeled_counts: array = array("i")
+        self._total_counts: array = array("i")
 
         # repo_name -> (fully_labeled_issues, total_issues_with_resolved_agents)
         self._repo_stats: dict[str, tuple[int, int]] = {}
 
-    def rebuild_cache(self) -> None:
+        # problem_id -> set of agent names with a label (all agents, not just
+        # resolved ones), so the stats endpoint can skip filesystem scans
+        self._labeled_agents: dict[str, set[str]] = {}
+
+        # problem_id -> repo, so label updates resolve the repo without
+        # going back to the scanner
+        self._problem_repo: dict[str, str] = {}
+
+        # Updates queued by endpoints and coalesced by run_update_worker
+        self._pending: asyncio.Queue[tuple[str, str, bool]] = asyncio.Queue()
+
+    def load_or_rebuild(self) -> dict[str, int]:
+        """
+        Restore the persisted cache if its fingerprint still matches;
+        otherwise fall back to a full rebuild.
+
+        Called on startup. Admin refresh calls rebuild_cache directly so an
+        explicit refresh always rescans.
+        """
+        fingerprint = self._fingerprint()
+        try:
+            with open(_CACHE_FILE, "rb") as f:
+                payload = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return self.rebuild_cache()
+
+        if payload.get("fingerprint") != fingerprint:
+            return self.rebuild_cache()
+
+        try:
+            self._problem_idx = payload["problem_idx"]
+            self._labeled_counts = array("i", payload["labeled_counts"])
+            self._total_counts = array("i", payload["total_counts"])
+            self._repo_stats = {
+                repo: (counts[0], counts[1])
+                for repo, counts in payload["repo_stats"].items()
+            }
+            self._labeled_agents = {
+                pid: set(agents) for pid, agents in payload["labeled_agents"].items()
+            }
+            self._problem_repo = payload["problem_repo"]
+            summary: dict[str, int] = payload["summary"]
+        except (KeyError, IndexError, TypeError):
+            # Corrupt or outdated snapshot layout; rebuild from scratch
+            return self.rebuild_cache()
+        return summary
+
+    def _fingerprint(self) -> str:
+        """Cheap change detector: entry counts plus max mtime over the
+        labels tree and every agent's results.json."""
+        count = 0
+        max_mtime = 0
+
+        try:
+            agent_dirs = os.scandir(file_service.labels_dir)
+        except FileNotFoundError:
+            agent_dirs = None
+        if agent_dirs is not None:
+            with agent_dirs:
+                for agent_entry in agent_dirs:
+                    if not agent_entry.is_dir(follow_symlinks=False):
+                        continue
+                    with os.scandir(agent_entry.path) as entries:
+                        for entry in entries:
+                            count += 1
+                            mtime = entry.stat(follow_symlinks=False).st_mtime_ns
+                            if mtime > max_mtime:
+                                max_mtime = mtime
+
+        # Resolved counts come from results.json, so those mtimes are part
+        # of the fingerprint too
+        try:
+            data_dirs = os.scandir(scanner.data_dir)
+        except FileNotFoundError:
+            data_dirs = None
+        if data_dirs is not None:
+            with data_dirs:
+                for entry in data_dirs:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    try:
+                        st = os.stat(os.path.join(entry.path, "results.json"))
+                    except OSError:
+                        continue
+                    count += 1
+                    if st.st_mtime_ns > max_mtime:
+                        max_mtime = st.st_mtime_ns
+
+        return f"{count}:{max_mtime}"
+
+    def _save_snapshot(self, fingerprint: str, summary: dict[str, int]) -> None:
+        """Atomically persist the cache state next to the data it mirrors."""
+        payload = {
+            "fingerprint": fingerprint,
+            "summary": summary,
+            "problem_idx": self._problem_idx,
+            "labeled_counts": list(self._labeled_counts),
+            "total_counts": list(self._total_counts),
+            "repo_stats": self._repo_stats,
+            "labeled_agents": {
+                pid: sorted(agents) for pid, agents in self._labeled_agents.items()
+            },
+            "problem_repo": self._problem_repo,
+        }
+        tmp_file = f"{_CACHE_FILE}.tmp"
+        try:
+            os.makedirs(os.path.dirname(_CACHE_FILE), exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                _ = f.write(orjson.dumps(payload))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, _CACHE_FILE)
+        except OSError as e:
+            # Next start just rebuilds; not worth failing over
+            print(f"Warning: Failed to persist label stats cache: {e}")
+
+    def rebuild_cache(self) -> dict[str, int]:
         """
         Rebuild the entire cache by scanning all problems and labels.
         Called on startup and admin refresh.
+
+        Returns summary counters from the rebuild pass so callers can report
+        refresh statistics without walking the data a second time.
         """
-        self._problem_stats.clear()
+        fingerprint = self._fingerprint()
+        self._problem_idx.clear()
+        self._labeled_counts = array("i")
+        self._total_counts = array("i")
         self._repo_stats.clear()
+        self._labeled_agents.clear()
+        self._problem_repo.clear()
 
         # Get all problems
         all_problems = scanner.get_problems()
 
+        # One directory sweep yields every labeled (agent, problem) pair;
+        # stats only need names, so no label content is ever read here
+        # Agent and repo names recur across thousands of keys and set
+        # members; interning collapses duplicates to one object, so set
+        # and dict probes short-circuit on identity before comparing
+        labeled_by_problem: dict[str, set[str]] = {}
+        for agent_name, problem_ids in file_service.list_label_files().items():
+            agent_name = sys.intern(agent_name)
+            for problem_id in problem_ids:
+                labeled_by_problem.setdefault(problem_id, set()).add(agent_name)
+
         # Track repo issue counts
         repo_issue_counts: dict[str, int] = {}
         repo_fully_labeled_counts: dict[str, int] = {}
+        total_labels = 0
 
         for problem in all_problems:
-            # Get all submissions for this problem
-            submissions = scanner.get_all_agent_submissions(problem.problem_id)
-
-            # Find resolved agents
-            resolved_agents = [
-                agent_name
-                for agent_name, submission in submissions.items()
-                if submission.resolved
-            ]
+            # Resolved agents come straight from the scanner's in-memory
+            # index; no AgentSubmission models are materialized here
+            resolved_agents = {
+                sys.intern(name)
+                for name in scanner.get_resolved_agents(problem.problem_id)
+            }
             total_resolved = len(resolved_agents)
 
+            # Record labeled agents for every problem (the stats endpoint
+            # serves from this set regardless of resolved status)
+            labeled_agent_names = labeled_by_problem.get(problem.problem_id, set())
+            self._labeled_agents[problem.problem_id] = labeled_agent_names
+            self._problem_repo[problem.problem_id] = sys.intern(problem.repo)
+            total_labels += len(labeled_agent_names)
+
             # Only count issues that have at least one resolved agent
             if total_resolved == 0:
                 continue
@@ -55,21 +211,15 @@ class LabelStatsCache:
             # Count issues with resolved agents per repo
             repo_issue_counts[problem.repo] = repo_issue_counts.get(problem.repo, 0) + 1
 
-            # Count resolved agents with labels
-            labels = file_service.get_all_labels_for_problem(problem.problem_id)
-            labeled_agent_names = {label.agent_name for label in labels}
-
-            # Only count labels for resolved agents
-            resolved_agents_with_labels = [
-                agent for agent in resolved_agents if agent in labeled_agent_names
-            ]
-            labeled_resolved_count = len(resolved_agents_with_labels)
+            # Only count labels for resolved agents: one C-level set
+            # intersection instead of a per-agent membership loop and a
+            # throwaway list
+            labeled_resolved_count = len(resolved_agents & labeled_agent_names)
 
-            # Store problem stats
-            self._problem_stats[problem.problem_id] = (
-                labeled_resolved_count,
-                total_resolved,
-            )
+            # Store problem stats in the next free slot
+            self._problem_idx[problem.problem_id] = len(self._labeled_counts)
+            self._labeled_counts.append(labeled_resolved_count)
+            self._total_counts.append(total_resolved)
 
             # Check if this issue is fully labeled (all resolved agents have labels)
             if total_resolved > 0 and labeled_resolved_count == total_resolved:
@@ -86,12 +236,33 @@ class LabelStatsCache:
                 total_issues_with_resolved_agents,
             )
 
+        summary = {
+            "problems": len(all_problems),
+            "problems_with_resolved_agents": len(self._problem_idx),
+            "repositories": len(self._repo_stats),
+            "labels": total_labels,
+        }
+        self._save_snapshot(fingerprint, summary)
+        return summary
+
     def get_problem_label_stats(self, problem_id: str) -> tuple[int, int]:
         """
         Get label stats for a problem.
         Returns (resolved_agents_with_labels, total_resolved_agents).
         """
-        return self._problem_stats.get(problem_id, (0, 0))
+        idx = self._problem_idx.get(problem_id)
+        if idx is None:
+            return (0, 0)
+        return (self._labeled_counts[idx], self._total_counts[idx])
+
+    def get_problem_label_stats_batch(
+        self, problem_ids: list[str]
+    ) -> dict[str, tuple[int, int]]:
+        """
+        Get label stats for many problems in one call.
+        Returns problem_id -> (resolved_agents_with_labels, total_resolved_agents).
+        """
+        return {pid: self.get_problem_label_stats(pid) for pid in problem_ids}
 
     def get_repo_label_stats(self, repo_name: str) -> tuple[int, int]:
         """
@@ -100,6 +271,48 @@ class LabelStatsCache:
         """
         return self._repo_stats.get(repo_name, (0, 0))
 
+    def get_labeled_agents(self, problem_id: str) -> set[str] | None:
+        """
+        Get the set of agents with a label for a problem.
+        Returns None on cache miss (e.g. the cache has not been built yet).
+        """
+        return self._labeled_agents.get(problem_id)
+
+    def enqueue_update(self, problem_id: str, agent_name: str, has_label: bool) -> None:
+        """Queue a label change to be applied by the background coalescer."""
+        self._pending.put_nowait((problem_id, agent_name, has_label))
+
+    async def run_update_worker(self, coalesce_window: float = 0.05) -> None:
+        """
+        Drain queued label updates, applying each burst in one batch.
+
+        Started from the FastAPI lifespan. Waits for the first update, then
+        collects everything that arrives within coalesce_window before
+        applying, so bulk labeling mutates the cache per batch instead of
+        per request. Selector caches are invalidated after each applied
+        batch — doing it any earlier would let a request re-cache repo
+        stats this batch is about to change.
+        """
+        # Imported here to avoid a circular import with the API layer
+        from backend.api.selectors import invalidate_selector_caches
+
+        while True:
+            batch = [await self._pending.get()]
+            await asyncio.sleep(coalesce_window)
+            while not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            for problem_id, agent_name, has_label in batch:
+                try:
+                    self.update_problem_label_stats(problem_id, agent_name, has_label)
+                except Exception as e:  # noqa: BLE001 - worker must survive
+                    # A bad update must not kill the worker; later writes
+                    # would otherwise never reach the cache
+                    print(
+                        "Warning: failed to apply label stats update for "
+                        f"{problem_id}/{agent_name}: {e}"
+                    )
+            invalidate_selector_caches(labels_only=True)
+
     def update_problem_label_stats(
         self, problem_id: str, agent_name: str, has_label: bool
     ) -> None:
@@ -111,6 +324,13 @@ class LabelStatsCache:
             agent_name: The agent name
             has_label: True if label was added, False if removed
         """
+        # Keep the labeled-agent set current for all agents, resolved or not
+        labeled = self._labeled_agents.setdefault(problem_id, set())
+        if has_label:
+            labeled.add(agent_name)
+        else:
+            labeled.discard(agent_name)
+
         # Check if this agent resolved the problem
         submissions = scanner.get_all_agent_submissions(problem_id)
         submission = submissions.get(agent_name)
@@ -118,53 +338,41 @@ class LabelStatsCache:
             # Agent didn't resolve this problem, no cache update needed
             return
 
-        # Get current stats
-        labeled_count, total_count = self._problem_stats.get(problem_id, (0, 0))
+        # Problems without a stats slot have no resolved agents, and the
+        # resolved check above already returned for those
+        idx = self._problem_idx.get(problem_id)
+        if idx is None:
+            return
+
+        labeled_count = self._labeled_counts[idx]
+        total_count = self._total_counts[idx]
+        was_full = total_count > 0 and labeled_count == total_count
 
-        # Update labeled count
+        # Update labeled count in place
         if has_label:
             labeled_count = min(labeled_count + 1, total_count)
         else:
             labeled_count = max(labeled_count - 1, 0)
+        self._labeled_counts[idx] = labeled_count
+        is_full = total_count > 0 and labeled_count == total_count
 
-        # Store updated problem stats
-        self._problem_stats[problem_id] = (labeled_count, total_count)
+        # Only this problem's fully-labeled bit can have moved, so repo
+        # stats shift by at most one — no recount over the repo's problems
+        if is_full != was_full:
+            repo = self._problem_repo.get(problem_id)
+            if repo:
+                self._apply_repo_full_delta(repo, 1 if is_full else -1)
 
-        # Update repo stats
-        problem = scanner.get_problem(problem_id)
-        if problem:
-            self._update_repo_stats_for_problem_change(problem.repo, problem_id)
+    def _apply_repo_full_delta(self, repo_name: str, delta: int) -> None:
+        """Shift a repo's fully-labeled count when one problem flips state.
 
-    def _update_repo_stats_for_problem_change(
-        self, repo_name: str, problem_id: str
-    ) -> None:
-        """Update repo stats when a problem's label status changes."""
-        # Get current repo stats
-        (
-            fully_labeled_issues,
-            total_issues_with_resolved_agents,
-        ) = self._repo_stats.get(repo_name, (0, 0))
-
-        # We need to recount fully labeled issues for this repo to be accurate
-        # This is simpler than tracking previous state
-        repo_problems = scanner.get_problems(repo=repo_name)
-        new_fully_labeled_count = 0
-        new_total_issues_with_resolved_agents = 0
-
-        for problem in repo_problems:
-            prob_labeled, prob_total = self._problem_stats.get(
-                problem.problem_id, (0, 0)
-            )
-            # Only count problems that have resolved agents
-            if prob_total > 0:
-                new_total_issues_with_resolved_agents += 1
-                if prob_labeled == prob_total:
-                    new_fully_labeled_count += 1
-
-        # Update repo stats
+        The changed problem still has the same resolved agents, so the
+        repo's total of issues with resolved agents is untouched.
+        """
+        fully_labeled_issues, total_issues = self._repo_stats.get(repo_name, (0, 0))
         self._repo_stats[repo_name] = (
-            new_fully_labeled_count,
-            new_total_issues_with_resolved_agents,
+            min(max(fully_labeled_issues + delta, 0), total_issues),
+            total_issues,
         )
 
 
@@ -0,0 +1,66 @@
+import pytest
+from watchfiles import Change
+
+from backend.services import data_scanner as data_scanner_module
+from backend.services.data_scanner import DataScanner
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    """A scanner over a temp data dir with one agent and one patch."""
+    # Keep the test offline: the scan only needs empty ground truth info
+    monkeypatch.setattr(
+        data_scanner_module.ground_truth_loader,
+        "get_problem_info_batch",
+        lambda problem_ids: {},
+    )
+    monkeypatch.setattr(
+        data_scanner_module.ground_truth_loader,
+        "get_problem_info",
+        lambda problem_id: None,
+    )
+
+    agent_dir = tmp_path / "agent_a"
+    agent_dir.mkdir()
+    (agent_dir / "django__django-1_patch.diff").write_text("diff --git a/x b/x\n")
+
+    scanner = DataScanner(data_dir=str(tmp_path))
+    scanner.scan_data()
+    return scanner
+
+
+def test_watch_add_event_indexes_new_patch(scanner, tmp_path):
+    patch_file = tmp_path / "agent_a" / "django__django-2_patch.diff"
+    patch_file.write_text("diff --git a/y b/y\n")
+
+    # watchfiles reports absolute paths
+    scanner._apply_change(Change.added, str(patch_file.resolve()))
+
+    submission = scanner.get_agent_submission("agent_a", "django__django-2")
+    assert submission is not None
+    assert submission.exists
+
+
+def test_watch_delete_event_drops_patch(scanner, tmp_path):
+    patch_file = tmp_path / "agent_a" / "django__django-1_patch.diff"
+    patch_file.unlink()
+
+    scanner._apply_change(Change.deleted, str(patch_file.resolve()))
+
+    submission = scanner.get_agent_submission("agent_a", "django__django-1")
+    assert submission is not None
+    assert not submission.exists
+
+
+def test_watch_add_event_registers_new_agent(scanner, tmp_path):
+    agent_dir = tmp_path / "agent_b"
+    agent_dir.mkdir()
+    patch_file = agent_dir / "django__django-1_patch.diff"
+    patch_file.write_text("diff --git a/x b/x\n")
+
+    scanner._apply_change(Change.added, str(patch_file.resolve()))
+
+    assert "agent_b" in scanner.get_agents()
+    submission = scanner.get_agent_submission("agent_b", "django__django-1")
+    assert submission is not None
+    assert submission.exists
@@ -1,4 +1,9 @@
-# Shared Pydantic models between backend components
+# Shared models between backend components.
+#
+# Models served through FastAPI responses stay Pydantic for schema
+# generation; internal-only value types are slots dataclasses, which
+# construct several times faster and hold no per-instance dict.
+from dataclasses import dataclass
 from datetime import datetime
 
 from pydantic import BaseModel, Field
@@ -87,33 +92,35 @@ class PatchInfo(BaseModel):
     deletions: int = Field(default=0, description="Number of lines deleted")
 
 
-class Label(BaseModel):
-    """User label/comment for a specific problem-agent combination."""
+@dataclass(slots=True, frozen=True)
+class Label:
+    """User label/comment for a specific problem-agent combination.
 
-    problem_id: str = Field(..., description="Problem identifier")
-    agent_name: str = Field(..., description="Agent name")
-    content: str = Field(..., description="Markdown content of the label")
-    created_at: datetime = Field(..., description="Timestamp when label was created")
-    updated_at: datetime = Field(
-        ..., description="Timestamp when label was last updated"
-    )
+    Internal value type — never serialized by FastAPI directly.
+    """
+
+    problem_id: str
+    agent_name: str
+    content: str
+    created_at: datetime
+    updated_at: datetime
 
 
-class LabelStats(BaseModel):
+@dataclass(slots=True, frozen=True)
+class LabelStats:
     """Statistics about labeling progress for a problem."""
 
-    problem_id: str = Field(..., description="Problem identifier")
-    total_agents: int = Field(
-        ..., description="Total number of agents for this problem"
-    )
-    labeled_agents: int = Field(..., description="Number of agents with labels")
-    unlabeled_agents: int = Field(..., description="Number of agents without labels")
+    problem_id: str
+    total_agents: int
+    labeled_agents: int
+    unlabeled_agents: int
 
 
-class DataStats(BaseModel):
+@dataclass(slots=True, frozen=True)
+class DataStats:
     """Overall dataset statistics."""
 
-    agents: int = Field(..., description="Number of agents")
-    repositories: int = Field(..., description="Number of repositories")
-    problems: int = Field(..., description="Number of problems")
-    total_submissions: int = Field(..., description="Total number of submissions")
+    agents: int
+    repositories: int
+    problems: int
+    total_submissions: int